@@ -1,30 +1,35 @@
-from aoc_2024 import (
-    day_1,
-    day_2,
-    day_3,
-    day_4,
-    day_5,
-    day_6,
-    day_7,
-    day_8,
-    day_9,
-    day_10,
-    day_11,
-    day_12,
-    day_13,
-    day_14,
-    day_15,
-    day_16,
-    day_17,
-    day_18,
-    day_19,
-    day_20,
-    day_21,
-    day_22,
-    day_23,
-    day_24,
-    day_25,
-)
+import importlib
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aoc_2024 import (
+        day_1,
+        day_2,
+        day_3,
+        day_4,
+        day_5,
+        day_6,
+        day_7,
+        day_8,
+        day_9,
+        day_10,
+        day_11,
+        day_12,
+        day_13,
+        day_14,
+        day_15,
+        day_16,
+        day_17,
+        day_18,
+        day_19,
+        day_20,
+        day_21,
+        day_22,
+        day_23,
+        day_24,
+        day_25,
+    )
 
 __all__ = [
     "day_1",
@@ -53,3 +58,18 @@ __all__ = [
     "day_24",
     "day_25",
 ]
+
+
+def __getattr__(name: str) -> ModuleType:
+    # Days pull in heavy dependencies (sympy, numpy) and some do work at import
+    # time, so only load them when they are first asked for.
+    if name in __all__:
+        module = importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,59 @@
+from collections import deque
+from collections.abc import Iterator, Sequence
+
+
+class AhoCorasick:
+    """
+    Finds every occurrence of a set of byte strings in one pass over a text.
+    The automaton is built once with all failure transitions resolved, so
+    searching costs one dict lookup per byte however many patterns there are.
+    Bytes that aren't in any pattern have no transition and go back to the
+    root.
+    """
+
+    def __init__(self, patterns: Sequence[bytes]) -> None:
+        if any(not pattern for pattern in patterns):
+            msg = "Patterns can't be empty."
+            raise ValueError(msg)
+        self.patterns = patterns
+        goto: list[dict[int, int]] = [{}]
+        outputs: list[list[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for byte in pattern:
+                if byte not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][byte] = len(goto) - 1
+                state = goto[state][byte]
+            outputs[state].append(index)
+
+        # Breadth first, so the failure state of a parent and every transition
+        # of a shallower state are known by the time a state is reached.
+        alphabet = {byte for pattern in patterns for byte in pattern}
+        fail = [0] * len(goto)
+        self.delta: list[dict[int, int]] = [dict(goto[0])] + [{}] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[fail[state]])
+            row = {}
+            for byte in alphabet:
+                if byte in goto[state]:
+                    child = goto[state][byte]
+                    fail[child] = self.delta[fail[state]].get(byte, 0)
+                    row[byte] = child
+                    queue.append(child)
+                elif target := self.delta[fail[state]].get(byte, 0):
+                    row[byte] = target
+            self.delta[state] = row
+        self.outputs = [tuple(output) for output in outputs]
+
+    def search(self, text: bytes) -> Iterator[tuple[int, int]]:
+        """Yield (end, pattern index) for each match, end being exclusive."""
+        delta, outputs = self.delta, self.outputs
+        state = 0
+        for position, byte in enumerate(text, 1):
+            state = delta[state].get(byte, 0)
+            for index in outputs[state]:
+                yield position, index
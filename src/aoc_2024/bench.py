@@ -0,0 +1,315 @@
+import argparse
+import contextlib
+import importlib
+import importlib.util
+import io
+import json
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import NamedTuple
+
+from rich.console import Console
+from rich.table import Table
+
+from aoc_2024 import progress
+from aoc_2024.generators import generate
+from aoc_2024.parse_cache import clear_cache
+from aoc_2024.runner import discover_days, discover_package, load_puzzle, make_puzzle
+
+DEFAULT_BASELINE = Path("bench_baseline.json")
+DEFAULT_IMPORT_BUDGET_MS = 50.0
+
+
+class Timing(NamedTuple):
+    median: float
+    p95: float
+
+
+class SweepPoint(NamedTuple):
+    size: int
+    input_bytes: int
+    median: float
+    peak_memory: int
+
+
+def p95(samples: list[float]) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=20, method="inclusive")[18]
+
+
+def bench_part(
+    package: str, day: int, part: int, repeats: int, test: bool = False
+) -> Timing:
+    puzzle = load_puzzle(package, day, test)
+    module = importlib.import_module(f"{package}.day_{day}")
+    solve = getattr(module, f"part_{part}")
+
+    samples = []
+    for _ in range(repeats):
+        # Every repeat pays for its own parse, like the baseline did.
+        clear_cache()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            solve(puzzle)
+        samples.append(time.perf_counter() - start)
+    return Timing(statistics.median(samples), p95(samples))
+
+
+def bench_all(
+    package: str, days: list[int], repeats: int, test: bool = False
+) -> dict[str, Timing]:
+    timings = {}
+    for day in days:
+        for part in (1, 2):
+            timings[f"day_{day}.part_{part}"] = bench_part(
+                package, day, part, repeats, test
+            )
+    return timings
+
+
+def sweep_part(
+    package: str, day: int, part: int, sizes: list[int], repeats: int, seed: int = 0
+) -> list[SweepPoint]:
+    """Time a part on generated inputs of growing size to see how it scales."""
+    module = importlib.import_module(f"{package}.day_{day}")
+    solve = getattr(module, f"part_{part}")
+
+    points = []
+    for size in sizes:
+        puzzle = make_puzzle(generate(day, size, seed))
+        samples = []
+        for _ in range(repeats):
+            # Parsing is part of the cost being measured, don't reuse it.
+            clear_cache()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                solve(puzzle)
+            samples.append(time.perf_counter() - start)
+
+        # Tracing slows everything down, so memory gets its own run.
+        clear_cache()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            solve(puzzle)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        points.append(
+            SweepPoint(size, len(puzzle.raw), statistics.median(samples), peak)
+        )
+    return points
+
+
+def plot_sweep(day: int, part: int, points: list[SweepPoint], path: Path) -> None:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError as e:
+        msg = "Plotting a sweep needs matplotlib installed."
+        raise RuntimeError(msg) from e
+
+    fig, (time_ax, memory_ax) = plt.subplots(1, 2, figsize=(10, 4))
+    sizes = [point.size for point in points]
+    time_ax.loglog(sizes, [point.median for point in points], marker="o")
+    time_ax.set_xlabel("n")
+    time_ax.set_ylabel("Median (s)")
+    memory_ax.loglog(sizes, [point.peak_memory / 2**20 for point in points], marker="o")
+    memory_ax.set_xlabel("n")
+    memory_ax.set_ylabel("Peak traced memory (MiB)")
+    fig.suptitle(f"day_{day}.part_{part}")
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def import_time(package: str, repeats: int) -> float:
+    """Median time in seconds for a fresh interpreter to import the package."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {package}; print(time.perf_counter() - start)"
+    )
+    samples = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, check=True, text=True
+        )
+        samples.append(float(result.stdout))
+    return statistics.median(samples)
+
+
+def load_baseline(path: Path) -> dict[str, Timing]:
+    raw = json.loads(path.read_text())
+    return {name: Timing(**timing) for name, timing in raw.items()}
+
+
+def save_baseline(path: Path, timings: dict[str, Timing]) -> None:
+    raw = {name: timing._asdict() for name, timing in timings.items()}
+    path.write_text(json.dumps(raw, indent=2) + "\n")
+
+
+def find_regressions(
+    timings: dict[str, Timing],
+    baseline: dict[str, Timing],
+    ratio: float,
+    floor: float = 0.0,
+) -> list[str]:
+    regressions = []
+    for name, timing in timings.items():
+        if name not in baseline:
+            continue
+        # Parts that finish in a few milliseconds are mostly noise.
+        if timing.median > max(baseline[name].median * ratio, floor):
+            regressions.append(name)
+    return regressions
+
+
+def build_table(
+    timings: dict[str, Timing], baseline: dict[str, Timing], regressions: list[str]
+) -> Table:
+    table = Table(title="Benchmarks")
+    table.add_column("Part")
+    table.add_column("Median (s)", justify="right")
+    table.add_column("p95 (s)", justify="right")
+    table.add_column("Baseline (s)", justify="right")
+    table.add_column("Ratio", justify="right")
+    for name, timing in timings.items():
+        if name in baseline:
+            ratio = f"{timing.median / max(baseline[name].median, 1e-9):.2f}"
+            previous = f"{baseline[name].median:.4f}"
+        else:
+            ratio = previous = "-"
+        if name in regressions:
+            ratio = f"[red]{ratio}[/red]"
+        table.add_row(
+            name, f"{timing.median:.4f}", f"{timing.p95:.4f}", previous, ratio
+        )
+    return table
+
+
+def build_sweep_table(day: int, part: int, points: list[SweepPoint]) -> Table:
+    table = Table(title=f"Sweep of day_{day}.part_{part}")
+    table.add_column("n", justify="right")
+    table.add_column("Input (KiB)", justify="right")
+    table.add_column("Median (s)", justify="right")
+    table.add_column("Peak memory (MiB)", justify="right")
+    for point in points:
+        table.add_row(
+            str(point.size),
+            f"{point.input_bytes / 2**10:.1f}",
+            f"{point.median:.4f}",
+            f"{point.peak_memory / 2**20:.2f}",
+        )
+    return table
+
+
+def sweep(package: str, args: argparse.Namespace) -> int:
+    if args.plot is not None and importlib.util.find_spec("matplotlib") is None:
+        print("Plotting a sweep needs matplotlib installed.", file=sys.stderr)
+        return 1
+
+    console = Console()
+    parts = [args.part] if args.part else [1, 2]
+    for part in parts:
+        points = sweep_part(
+            package, args.sweep, part, args.sizes, args.repeats, args.seed
+        )
+        console.print(build_sweep_table(args.sweep, part, points))
+        if args.plot is not None:
+            path = args.plot
+            if len(parts) > 1:
+                path = path.with_stem(f"{path.stem}_part_{part}")
+            plot_sweep(args.sweep, part, points, path)
+    return 0
+
+
+def parse_sizes(value: str) -> list[int]:
+    return [int(size) for size in value.split(",")]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every day and part.")
+    parser.add_argument("days", nargs="*", type=int, help="Days to run, default all")
+    parser.add_argument("--base", default="base", help="Entry point name to load")
+    parser.add_argument("--test", action="store_true", help="Use the test inputs")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--ratio",
+        type=float,
+        default=1.25,
+        help="Fail when a median is slower than baseline by more than this factor",
+    )
+    parser.add_argument(
+        "--floor",
+        type=float,
+        default=0.005,
+        help="Never flag parts with a median below this many seconds",
+    )
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=DEFAULT_IMPORT_BUDGET_MS,
+        help="Fail when importing the package takes longer than this many ms",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Write the results as the new baseline"
+    )
+    parser.add_argument(
+        "--sweep",
+        type=int,
+        metavar="DAY",
+        help="Time a day on generated inputs of each size instead",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=[100, 1000, 10000],
+        help="Comma separated sizes for --sweep, what a size means depends on the day",
+    )
+    parser.add_argument("--part", type=int, choices=(1, 2), help="Only sweep one part")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --sweep inputs")
+    parser.add_argument(
+        "--plot", type=Path, help="Save a plot of the sweep, needs matplotlib"
+    )
+    args = parser.parse_args(argv)
+
+    # Progress output would be part of what gets timed.
+    progress.set_reporter(None)
+
+    package = discover_package(args.base)
+    if args.sweep is not None:
+        return sweep(package, args)
+
+    import_ms = import_time(package, args.repeats) * 1000
+    print(f"import {package}: {import_ms:.1f}ms (budget {args.import_budget:.1f}ms)")
+
+    days = args.days or discover_days(package)
+    timings = bench_all(package, days, args.repeats, args.test)
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = load_baseline(args.baseline)
+    regressions = find_regressions(timings, baseline, args.ratio, args.floor)
+    Console().print(build_table(timings, baseline, regressions))
+
+    failed = False
+    if import_ms > args.import_budget:
+        print(f"Importing {package} is over budget.", file=sys.stderr)
+        failed = True
+    if args.save:
+        save_baseline(args.baseline, {**baseline, **timings})
+    elif regressions:
+        print("Regressed:", ", ".join(regressions), file=sys.stderr)
+        failed = True
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
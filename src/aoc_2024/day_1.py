@@ -1,20 +1,61 @@
+import tempfile
+import warnings
 from collections import Counter
+from collections.abc import Sequence
+from pathlib import Path
 from typing import Any
 
-from aoc.puzzle import PuzzleInput
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.streaming import AnyInput, StreamingInput, iter_lines
 
+try:
+    import numpy as np
 
-def parse_input(puzzle: PuzzleInput) -> tuple[list[int], list[int]]:
+    from aoc_2024 import external_sort
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+# Bytes of memory per byte of text the in memory solution is allowed. The parsed
+# columns, their sorted copies and the differences between them come to a bit
+# under four times the size of the text for typical five digit ids.
+IN_MEMORY_FACTOR = 4
+
+
+@cached_parse
+def parse_input(puzzle: AnyInput) -> tuple[Sequence[int], Sequence[int]]:
     left, right = [], []
-    for line in puzzle.lines:
+    for line in iter_lines(puzzle):
         a, b = line.split("   ", 1)
         left.append(int(a))
         right.append(int(b))
     return left, right
 
 
-def part_1(puzzle: PuzzleInput) -> Any:
-    left, right = parse_input(puzzle)
+@cached_parse
+def parse_arrays(puzzle: AnyInput) -> tuple["np.ndarray", "np.ndarray"]:
+    """Both columns as int64 arrays, parsed in a single pass in numpy."""
+    # Depending on the version numpy either raises or only warns and returns
+    # what it parsed so far when it hits something that isn't a number.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            if isinstance(puzzle, StreamingInput):
+                numbers = np.fromfile(puzzle.path, dtype=np.int64, sep=" ")
+            else:
+                numbers = np.fromstring(puzzle.raw, dtype=np.int64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            msg = "Input has something other than location ids."
+            raise ValueError(msg) from None
+    if len(numbers) % 2:
+        msg = "Input has a location id without a pair."
+        raise ValueError(msg)
+
+    # The parse is shared between parts, neither may sort it in place.
+    numbers.flags.writeable = False
+    return numbers[0::2], numbers[1::2]
+
+
+def distance(left: Sequence[int], right: Sequence[int]) -> int:
     left = sorted(left)
     right = sorted(right)
     total = 0
@@ -23,10 +64,108 @@ def part_1(puzzle: PuzzleInput) -> Any:
     return total
 
 
-def part_2(puzzle: PuzzleInput) -> Any:
-    left, right = parse_input(puzzle)
+def distance_numpy(left: "np.ndarray", right: "np.ndarray") -> int:
+    return int(np.abs(np.sort(left) - np.sort(right)).sum())
+
+
+def similarity(left: Sequence[int], right: Sequence[int]) -> int:
     reference = Counter(right)
     total = 0
     for num in left:
         total += num * reference.get(num, 0)
     return total
+
+
+def similarity_numpy(left: "np.ndarray", right: "np.ndarray") -> int:
+    values, counts = np.unique(right, return_counts=True)
+    if len(values) == 0:
+        return 0
+    index = np.searchsorted(values, left).clip(max=len(values) - 1)
+    found = values[index] == left
+    return int((left[found] * counts[index[found]]).sum())
+
+
+def spill_columns(
+    puzzle: StreamingInput, directory: Path, budget: int
+) -> tuple[list[Path], list[Path]]:
+    """
+    Cut both columns into sorted runs on disk. Each run takes an eighth of the
+    budget, and the text is read a thirty second of it at a time. A chunk
+    parses to at most four times its size, ids being at least a digit and a
+    space, so this all stays under half the budget.
+    """
+    run_size = budget // 8 // 8
+    left = external_sort.RunWriter(directory, "left", run_size)
+    right = external_sort.RunWriter(directory, "right", run_size)
+    for chunk in puzzle.iter_chunks(budget // 32):
+        # Same as parse_arrays, don't let numpy drop the rest of a chunk.
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            try:
+                numbers = np.fromstring(chunk, dtype=np.int64, sep=" ")
+            except (DeprecationWarning, ValueError):
+                msg = "Input has something other than location ids."
+                raise ValueError(msg) from None
+        if len(numbers) % 2:
+            msg = "Input has a location id without a pair."
+            raise ValueError(msg)
+        left.add(numbers[0::2])
+        right.add(numbers[1::2])
+    return left.finish(), right.finish()
+
+
+def distance_external(puzzle: StreamingInput, budget: int) -> int:
+    with tempfile.TemporaryDirectory(prefix="day_1.") as directory:
+        left, right = spill_columns(puzzle, Path(directory), budget)
+        total = 0
+        for a, b in external_sort.zip_blocks(
+            external_sort.merge_runs(left, budget // 2),
+            external_sort.merge_runs(right, budget // 2),
+        ):
+            total += int(np.abs(a - b).sum())
+        return total
+
+
+def similarity_external(puzzle: StreamingInput, budget: int) -> int:
+    with tempfile.TemporaryDirectory(prefix="day_1.") as directory:
+        left, right = spill_columns(puzzle, Path(directory), budget)
+        total = 0
+        for values, left_counts, right_counts in external_sort.join_counts(
+            external_sort.counted(external_sort.merge_runs(left, budget // 2)),
+            external_sort.counted(external_sort.merge_runs(right, budget // 2)),
+        ):
+            total += int((values * left_counts * right_counts).sum())
+        return total
+
+
+def out_of_core(puzzle: StreamingInput) -> int | None:
+    """
+    The memory budget when a streamed input is too big to sort in it, None
+    when the in memory solution will do, see IN_MEMORY_FACTOR.
+    """
+    budget = external_sort.memory_budget()
+    if len(puzzle.buffer) * IN_MEMORY_FACTOR <= budget:
+        return None
+    return budget
+
+
+def part_1(puzzle: AnyInput) -> Any:
+    if np is None:
+        return distance(*parse_input(puzzle))
+    if (
+        isinstance(puzzle, StreamingInput)
+        and (budget := out_of_core(puzzle)) is not None
+    ):
+        return distance_external(puzzle, budget)
+    return distance_numpy(*parse_arrays(puzzle))
+
+
+def part_2(puzzle: AnyInput) -> Any:
+    if np is None:
+        return similarity(*parse_input(puzzle))
+    if (
+        isinstance(puzzle, StreamingInput)
+        and (budget := out_of_core(puzzle)) is not None
+    ):
+        return similarity_external(puzzle, budget)
+    return similarity_numpy(*parse_arrays(puzzle))
@@ -1,77 +1,54 @@
-from collections import defaultdict
-from functools import cache
+from collections.abc import Sequence
 from typing import Any
 
-from aoc.datatypes import Coord, Direction
 from aoc.puzzle import PuzzleInput
-from frozendict import frozendict
-from tqdm import tqdm
-
-
-def parse_puzzle(
-    puzzle: PuzzleInput,
-) -> tuple[dict[Coord, int], list[Coord], list[Coord]]:
-    topo = {}
-    trailheads = []
-    ends = []
-    for row, line in enumerate(puzzle.lines):
-        for col, char in enumerate(line):
-            current = Coord(row, col)
-            if char == "0":
-                trailheads.append(current)
-            if char == "9":
-                ends.append(current)
-            if char == ".":
-                continue
-            topo[current] = int(char)
-    return topo, trailheads, ends
-
-
-def count_ends(start: Coord, topo: frozendict[Coord, int]):
-    seen = set()
-
-    @cache
-    def num_trails(start: Coord, topo: frozendict[Coord, int]) -> int:
-        if topo[start] == 9:
-            return 1
-
-        total = 0
-        for direction in [
-            Direction.NORTH,
-            Direction.SOUTH,
-            Direction.EAST,
-            Direction.WEST,
-        ]:
-            next = start + direction
-            if next in seen:
-                continue
-            if next not in topo:
-                continue
-            if topo[start] - topo[next] == -1:
-                seen.add(next)
-                total += num_trails(next, topo)
 
-        return total
+from aoc_2024.grid import Grid
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.progress import progress
+
+
+@cached_parse
+def parse_puzzle(puzzle: PuzzleInput) -> tuple[Grid, Sequence[int], Sequence[int]]:
+    """Heights are stored as their digit characters, "." is impassable."""
+    topo = Grid.from_lines(puzzle.lines)
+    return topo, topo.find_all("0"), topo.find_all("9")
+
+
+def count_ends(start: int, topo: Grid) -> int:
+    seen = {start}
+    to_explore = [start]
+    found = 0
+    while to_explore:
+        current = to_explore.pop()
+        if topo[current] == ord("9"):
+            found += 1
+            continue
+
+        for neighbor in topo.neighbors(current):
+            if neighbor in seen:
+                continue
+            if topo[neighbor] - topo[current] == 1:
+                seen.add(neighbor)
+                to_explore.append(neighbor)
 
-    found = num_trails(start, topo)
     return found
 
 
 def part_1(puzzle: PuzzleInput) -> Any:
     topo, heads, _ = parse_puzzle(puzzle)
-    topo_frozen = frozendict(topo)
     total = 0
-    for head in tqdm(heads):
-        total += count_ends(head, topo_frozen)
+    for head in progress(heads, "trailheads"):
+        total += count_ends(head, topo)
     return total
 
 
-def iterative_increment(topo: dict[Coord, int], ends: list[Coord]) -> dict[Coord, int]:
+def iterative_increment(topo: Grid, ends: Sequence[int]) -> list[int]:
     to_explore = set(ends)
-    moves: dict[Coord, int] = defaultdict(lambda: 0)
+    moves = [0] * len(topo)
     for nine in ends:
         moves[nine] = 1
-    for i in range(9, -1, -1):
+    for i in range(ord("9"), ord("0") - 1, -1):
         next_to_explore = set()
         while to_explore:
             pos = to_explore.pop()
@@ -81,25 +58,18 @@ def iterative_increment(topo: dict[Coord, int], ends: list[Coord]) -> dict[Coord
                 raise ValueError(msg)
 
             paths = 0
-            for direction in [
-                Direction.NORTH,
-                Direction.SOUTH,
-                Direction.EAST,
-                Direction.WEST,
-            ]:
-                walk = pos + direction
-                if walk in topo:
-                    if topo[walk] == i + 1:
-                        paths += moves[walk]
-                    if topo[walk] == i - 1:
-                        next_to_explore.add(walk)
+            for walk in topo.neighbors(pos):
+                if topo[walk] == i + 1:
+                    paths += moves[walk]
+                if topo[walk] == i - 1:
+                    next_to_explore.add(walk)
             # add to current so 9's stay at 1
             moves[pos] += paths
         to_explore = next_to_explore
     return moves
 
 
-def get_all_paths(starts: list[Coord], moves: dict[Coord, int]) -> int:
+def get_all_paths(starts: Sequence[int], moves: list[int]) -> int:
     total = 0
     for start in starts:
         total += moves[start]
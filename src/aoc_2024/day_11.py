@@ -3,7 +3,10 @@ from typing import Any
 
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.parse_cache import cached_parse
 
+
+@cached_parse
 def parse(p: PuzzleInput):
     return [int(x) for x in p.lines[0].split(" ")]
 
@@ -1,16 +1,15 @@
 import enum
 from typing import Any
 
-from aoc.datatypes import Coord, Direction
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.grid import ORTHOGONAL, Grid
+from aoc_2024.parse_cache import cached_parse
 
-def parse(puzzle: PuzzleInput) -> dict[Coord, str]:
-    garden = {}
-    for row, line in enumerate(puzzle.lines):
-        for col, char in enumerate(line):
-            garden[Coord(row, col)] = char
-    return garden
+
+@cached_parse
+def parse(puzzle: PuzzleInput) -> Grid:
+    return Grid.from_lines(puzzle.lines)
 
 
 class Pricing(enum.Enum):
@@ -18,58 +17,48 @@ class Pricing(enum.Enum):
     PERIMITER = enum.auto()
 
 
-def flood_fill(garden: dict[Coord, str], pricing: Pricing) -> int:
-    to_process = set(garden.keys())
+def count_sides(garden: Grid, perimiter: set[int]) -> int:
+    """
+    Perimiter edges are stored as cell * 4 + direction. An edge starts a new side
+    unless the cell to its left, looking out over the edge, has the same edge.
+    """
+    sides = 0
+    for edge in perimiter:
+        cell, direction = divmod(edge, 4)
+        left = garden.step(cell, (direction - 1) % 4)
+        if left is None or left * 4 + direction not in perimiter:
+            sides += 1
+    return sides
+
+
+def flood_fill(garden: Grid, pricing: Pricing) -> int:
+    seen = bytearray(len(garden))
     total = 0
-    while to_process:
-        current_plot = {to_process.pop()}
-        seen = current_plot.copy()
+    for plot_start in range(len(garden)):
+        if seen[plot_start]:
+            continue
+        plant = garden[plot_start]
+        current_plot = [plot_start]
+        seen[plot_start] = 1
         size = 1
-        perimiter: set[tuple[Coord, Coord]] = set()
+        perimiter: set[int] = set()
         while current_plot:
             current = current_plot.pop()
-            for direction in [
-                Direction.NORTH,
-                Direction.SOUTH,
-                Direction.WEST,
-                Direction.EAST,
-            ]:
-                neighbor = current + direction
-                if neighbor in seen:
+            mask = garden.masks[current]
+            for direction in ORTHOGONAL:
+                if not mask >> direction & 1:
+                    perimiter.add(current * 4 + direction)
                     continue
-                elif neighbor not in garden:
-                    perimiter.add((current, neighbor))
-                    # perimiter += 1
-                elif garden[current] == garden[neighbor]:
+                neighbor = current + garden.offsets[direction]
+                if garden[neighbor] != plant:
+                    perimiter.add(current * 4 + direction)
+                elif not seen[neighbor]:
                     size += 1
-                    current_plot.add(neighbor)
-                    to_process.discard(neighbor)
-                    seen.add(neighbor)
-                else:
-                    perimiter.add((current, neighbor))
-                    # perimiter += 1
+                    current_plot.append(neighbor)
+                    seen[neighbor] = 1
 
         if pricing == Pricing.SIDES:
-            sides = 0
-            while perimiter:
-                adjacent_edges = {perimiter.pop()}
-                sides += 1
-                while adjacent_edges:
-                    current = adjacent_edges.pop()
-                    a, b = current
-                    for direction in [
-                        Direction.NORTH,
-                        Direction.SOUTH,
-                        Direction.WEST,
-                        Direction.EAST,
-                    ]:
-                        na = a + direction
-                        nb = b + direction
-                        neighbor = (na, nb)
-                        if neighbor in perimiter:
-                            adjacent_edges.add(neighbor)
-                            perimiter.remove(neighbor)
-            total += size * sides
+            total += size * count_sides(garden, perimiter)
         elif pricing == Pricing.PERIMITER:
             total += size * len(perimiter)
 
@@ -82,6 +71,5 @@ def part_1(puzzle: PuzzleInput) -> Any:
 
 
 def part_2(puzzle: PuzzleInput) -> Any:
-    pass
     garden = parse(puzzle)
     return flood_fill(garden, Pricing.SIDES)
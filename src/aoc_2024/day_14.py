@@ -1,8 +1,14 @@
+import functools
+from collections import Counter
+from collections.abc import Sequence
 from typing import Any, NamedTuple
 
 from aoc.datatypes import Coord
 from aoc.puzzle import PuzzleInput
-from tqdm import tqdm
+
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.progress import progress
+from aoc_2024.render import emit
 
 
 class Robot(NamedTuple):
@@ -10,7 +16,8 @@ class Robot(NamedTuple):
     velocity: Coord
 
 
-def parse(puzzle: PuzzleInput) -> list[Robot]:
+@cached_parse
+def parse(puzzle: PuzzleInput) -> Sequence[Robot]:
     robots = []
     for line in puzzle.lines:
         p, v = line.split(" ")
@@ -24,22 +31,19 @@ def parse(puzzle: PuzzleInput) -> list[Robot]:
     return robots
 
 
-def display(robots: list[Coord], map_size: Coord) -> None:
+def draw_robots(robots: Sequence[Coord], map_size: Coord) -> list[str]:
+    counts = Counter(robots)
+    lines = []
     for row in range(map_size.row):
+        line = []
         for col in range(map_size.col):
-            current = Coord(row, col)
-            total = 0
-            for robot in robots:
-                if robot == current:
-                    total += 1
-            if total == 0:
-                print(".", end="")
-            else:
-                print(total, end="")
-        print()
-
-
-def get_safety_score(robots: list[Robot], steps: int, test: bool) -> int:
+            total = counts[Coord(row, col)]
+            line.append(str(total) if total else ".")
+        lines.append("".join(line))
+    return lines
+
+
+def get_safety_score(robots: Sequence[Robot], steps: int, test: bool) -> int:
     map_size = Coord(103, 101)
     if test:
         map_size = Coord(7, 11)
@@ -64,19 +68,12 @@ def get_safety_score(robots: list[Robot], steps: int, test: bool) -> int:
             elif robot.col > (map_size.col // 2):
                 quadrants[3] += 1
 
-    display(robot_pos, map_size)
+    emit(f"After {steps} steps", lambda: draw_robots(robot_pos, map_size))
     return quadrants[0] * quadrants[1] * quadrants[2] * quadrants[3]
 
 
-def christmas(robots: list[Robot], steps: int, test: bool) -> None:
-    for i in range(1000):
-        print("STEPS", i)
-        get_safety_score(robots, i, test)
-
-
-def christmas_2(robots: list[Robot], test: bool) -> int:
-    hashes = []
-    for steps in tqdm(range(10403)):
+def christmas_2(robots: Sequence[Robot], test: bool) -> int:
+    for steps in progress(range(10403), "steps"):
         map_size = Coord(103, 101)
         if test:
             map_size = Coord(7, 11)
@@ -89,11 +86,6 @@ def christmas_2(robots: list[Robot], test: bool) -> int:
             robot_pos.append(new_pos)
 
         points = frozenset(robot_pos)
-        if hashes and hash(points) == hashes[0]:
-            print("Hit a loop I think at ", steps)
-            # break
-        else:
-            hashes.append(hash(points))
 
         neighbors = 0
         for robot in robot_pos:
@@ -113,8 +105,10 @@ def christmas_2(robots: list[Robot], test: bool) -> int:
                     break
 
         if neighbors > 350:
-            print("Maybe found match at", steps)
-            display(robot_pos, map_size)
+            emit(
+                f"Maybe a tree after {steps} steps",
+                functools.partial(draw_robots, robot_pos, map_size),
+            )
             return steps
 
     msg = "No solution found"
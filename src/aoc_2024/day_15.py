@@ -1,114 +1,92 @@
-import enum
-from abc import abstractmethod
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Sequence
 from typing import Any
 
-from aoc.datatypes import Coord, Direction
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.grid import EAST, NORTH, SOUTH, WEST, Grid
+from aoc_2024.parse_cache import cached_parse
 
-def parse_move(char: str) -> Direction:
+WALL = ord("#")
+BOX = ord("O")
+BOX_LEFT = ord("[")
+BOX_RIGHT = ord("]")
+FLOOR = ord(".")
+
+
+def parse_move(char: str) -> int:
     match char:
         case "v":
-            return Direction.SOUTH
+            return SOUTH
         case "^":
-            return Direction.NORTH
+            return NORTH
         case "<":
-            return Direction.WEST
+            return WEST
         case ">":
-            return Direction.EAST
+            return EAST
     msg = "Invalid symbol"
     raise ValueError(msg)
 
 
-def parse_moves(line: str) -> list[Direction]:
+def parse_moves(line: str) -> list[int]:
     orders = []
     for char in line:
         orders.append(parse_move(char))
     return orders
 
 
-class MapObjects(enum.Enum):
-    WALL = "#"
-    BOX = "O"
-    ROBOT = "@"
-    FLOOR = "."
-
-
-def parse_maze(maze_raw: list[str]) -> dict[Coord, MapObjects]:
-    maze = {}
-    for row, line in enumerate(maze_raw):
-        for col, char in enumerate(line):
-            current = Coord(row, col)
-            match char:
-                case MapObjects.WALL.value:
-                    maze[current] = MapObjects.WALL
-                case MapObjects.BOX.value:
-                    maze[current] = MapObjects.BOX
-                case MapObjects.FLOOR.value:
-                    maze[current] = MapObjects.FLOOR
-                case MapObjects.ROBOT.value:
-                    maze[current] = MapObjects.ROBOT
-    return maze
-
-
-def gps_value(maze: dict[Coord, MapObjects]) -> int:
+def gps_value(maze: Grid, box: int) -> int:
     total = 0
-    for loc, item in maze.items():
-        if item == MapObjects.BOX:
-            total += (100 * loc.row) + loc.col
+    for index in maze.find_all(chr(box)):
+        row, col = divmod(index, maze.cols)
+        total += (100 * row) + col
     return total
 
 
-def parse_puzzle(
-    puzzle: PuzzleInput,
-) -> tuple[dict[Coord, MapObjects], list[Direction]]:
+@cached_parse
+def parse_puzzle(puzzle: PuzzleInput) -> tuple[Grid, Sequence[int]]:
     maze_lines_raw, direction_lines_raw = puzzle.raw.split("\n\n")
     maze_lines = maze_lines_raw.splitlines()
     direction_line = "".join(direction_lines_raw.splitlines())
 
-    maze = parse_maze(maze_lines)
+    maze = Grid.from_lines(maze_lines)
     orders = parse_moves(direction_line)
     return maze, orders
 
 
-def push_box(box: Coord, direction: Direction, maze: dict[Coord, MapObjects]) -> bool:
-    next_loc = box + direction
-    while next_loc in maze and maze[next_loc] == MapObjects.BOX:
-        next_loc = next_loc + direction
-    if maze[next_loc] == MapObjects.WALL:
+def push_box(box: int, offset: int, maze: bytearray) -> bool:
+    next_loc = box + offset
+    while maze[next_loc] == BOX:
+        next_loc += offset
+    if maze[next_loc] == WALL:
         # All locked because they hit a wall
         return False
 
     # We have a floor
-    maze[next_loc] = MapObjects.BOX
-    maze[box] = MapObjects.FLOOR
+    maze[next_loc] = BOX
+    maze[box] = FLOOR
     return True
 
 
-def move_robot(maze: dict[Coord, MapObjects], orders: list[Direction]) -> int:
-    robot = None
-    for loc, item in maze.items():
-        if item == MapObjects.ROBOT:
-            robot = loc
-
-    if robot is None:
-        msg = "No robot start found"
-        raise ValueError(msg)
-    maze[robot] = MapObjects.FLOOR
+def move_robot(grid: Grid, orders: Sequence[int]) -> int:
+    # The parsed grid is shared through the parse cache, push boxes around a copy.
+    maze = bytearray(grid.cells)
+    robot = grid.find("@")
+    maze[robot] = FLOOR
 
     for order in orders:
-        next_loc = robot + order
-        if maze[next_loc] == MapObjects.WALL:
+        offset = grid.offsets[order]
+        next_loc = robot + offset
+        if maze[next_loc] == WALL:
             pass
-        elif maze[next_loc] == MapObjects.FLOOR:
+        elif maze[next_loc] == FLOOR:
             robot = next_loc
-        elif maze[next_loc] == MapObjects.BOX:
-            pushed = push_box(next_loc, order, maze)
+        elif maze[next_loc] == BOX:
+            pushed = push_box(next_loc, offset, maze)
             if pushed is True:
                 robot = next_loc
 
-    return gps_value(maze)
+    return gps_value(Grid(grid.rows, grid.cols, bytes(maze)), BOX)
 
 
 def part_1(puzzle: PuzzleInput) -> Any:
@@ -116,144 +94,75 @@ def part_1(puzzle: PuzzleInput) -> Any:
     return move_robot(maze, orders)
 
 
-@dataclass
-class MO:
-    left: Coord
-    right: Coord
-
-    @abstractmethod
-    def can_push(self, direction: Direction, maze: dict[Coord, "MO"]) -> bool:
-        raise NotImplementedError
-
-    @abstractmethod
-    def push(self, direction: Direction, maze: dict[Coord, "MO"]) -> None:
-        raise NotImplementedError
+def widen(line: str) -> str:
+    wider: dict[str, str | int | None] = {"#": "##", "O": "[]", ".": "..", "@": "@."}
+    return line.translate(str.maketrans(wider))
 
 
-class Wall(MO):
-    def can_push(self, direction: Direction, maze: dict[Coord, "MO"]) -> bool:
-        return False
-
-    def push(self, direction: Direction, maze: dict[Coord, "MO"]) -> None:
-        msg = "Tried to push a wall."
-        raise ValueError(msg)
-
-
-class Box(MO):
-    def can_push(self, direction: Direction, maze: dict[Coord, "MO"]) -> bool:
-        if direction in (Direction.EAST, Direction.WEST):
-            if direction == Direction.EAST:
-                n = self.right + direction
-            else:
-                n = self.left + direction
-            if n in maze:
-                if isinstance(maze[n], Wall):
-                    return False
-                elif isinstance(maze[n], Box):
-                    return maze[n].can_push(direction, maze)
-                else:
-                    raise ValueError
-            return True
-        else:
-            ln = self.left + direction
-            rn = self.right + direction
-
-            left_pushable = right_pushable = True
-            if ln in maze:
-                left_pushable = maze[ln].can_push(direction, maze)
-            if rn in maze:
-                right_pushable = maze[rn].can_push(direction, maze)
-            return left_pushable and right_pushable
-
-    def push(self, direction: Direction, maze: dict[Coord, "MO"]) -> None:
-        if direction in (Direction.EAST, Direction.WEST):
-            if direction == Direction.EAST:
-                n = self.right + direction
-            else:
-                n = self.left + direction
-            if n in maze:
-                maze[n].push(direction, maze)
-        else:
-            ln = self.left + direction
-            rn = self.right + direction
-            if ln in maze and rn in maze and maze[ln] == maze[rn]:
-                maze[ln].push(direction, maze)
-            else:
-                if ln in maze:
-                    maze[ln].push(direction, maze)
-                if rn in maze:
-                    maze[rn].push(direction, maze)
-        del maze[self.left]
-        del maze[self.right]
-        self.left += direction
-        self.right += direction
-        maze[self.left] = self
-        maze[self.right] = self
-
-
-def parse_maze_2(maze_raw: list[str]) -> tuple[dict[Coord, MO], Coord]:
-    maze: dict[Coord, MO] = {}
-    robot = None
-    for row, line in enumerate(maze_raw):
-        col = 0
-        for char in line:
-            left = Coord(row, col)
-            right = Coord(row, col + 1)
-            match char:
-                case MapObjects.WALL.value:
-                    wall = Wall(left, right)
-                    maze[left] = wall
-                    maze[right] = wall
-                case MapObjects.BOX.value:
-                    box = Box(left, right)
-                    maze[left] = box
-                    maze[right] = box
-                case MapObjects.ROBOT.value:
-                    robot = left
-            col += 2
-    if robot is None:
-        raise ValueError
-    return maze, robot
-
-
-def parse_puzzle_2(
-    puzzle: PuzzleInput,
-) -> tuple[dict[Coord, MO], Coord, list[Direction]]:
+@cached_parse
+def parse_puzzle_2(puzzle: PuzzleInput) -> tuple[Grid, Sequence[int]]:
     maze_lines_raw, direction_lines_raw = puzzle.raw.split("\n\n")
-    maze_lines = maze_lines_raw.splitlines()
+    maze_lines = [widen(line) for line in maze_lines_raw.splitlines()]
     direction_line = "".join(direction_lines_raw.splitlines())
 
-    maze, robot = parse_maze_2(maze_lines)
+    maze = Grid.from_lines(maze_lines)
     orders = parse_moves(direction_line)
-    return maze, robot, orders
+    return maze, orders
 
 
-def gps_value_2(maze: dict[Coord, MO]) -> int:
-    mo = maze.values()
+def boxes_to_push(box: int, offset: int, maze: bytearray) -> list[int] | None:
+    """
+    Every box cell that moves when pushing into box, or None when something hits
+    a wall.
+    """
+    vertical = abs(offset) > 1
+    to_push = []
     seen = set()
-    total = 0
-    for item in mo:
-        if item.left in seen:
+    frontier = deque([box])
+    while frontier:
+        current = frontier.popleft()
+        if current in seen:
             continue
-        if isinstance(item, Box):
-            total += (100 * item.left.row) + item.left.col
-            seen.add(item.left)
-    return total
+        cell = maze[current]
+        if cell == WALL:
+            return None
+        if cell == FLOOR:
+            continue
+        seen.add(current)
+        to_push.append(current)
+        frontier.append(current + offset)
+        if vertical:
+            # Boxes are two wide, the other half moves along
+            frontier.append(current + 1 if cell == BOX_LEFT else current - 1)
+    return to_push
+
 
+def move_robot_2(grid: Grid, orders: Sequence[int]) -> int:
+    maze = bytearray(grid.cells)
+    robot = grid.find("@")
+    maze[robot] = FLOOR
 
-def move_robot_2(maze: dict[Coord, MO], robot: Coord, orders: list[Direction]) -> int:
     for order in orders:
-        next_loc = robot + order
-        if next_loc in maze:
-            if maze[next_loc].can_push(order, maze) is True:
-                maze[next_loc].push(order, maze)
-                robot = next_loc
-        else:
+        offset = grid.offsets[order]
+        next_loc = robot + offset
+        if maze[next_loc] == WALL:
+            continue
+        if maze[next_loc] == FLOOR:
             robot = next_loc
+            continue
+
+        to_push = boxes_to_push(next_loc, offset, maze)
+        if to_push is None:
+            continue
+        # Move the cells furthest along the push first
+        for cell in sorted(to_push, key=lambda x: x * offset, reverse=True):
+            maze[cell + offset] = maze[cell]
+            maze[cell] = FLOOR
+        robot = next_loc
 
-    return gps_value_2(maze)
+    return gps_value(Grid(grid.rows, grid.cols, bytes(maze)), BOX_LEFT)
 
 
 def part_2(puzzle: PuzzleInput) -> Any:
-    maze, robot, orders = parse_puzzle_2(puzzle)
-    return move_robot_2(maze, robot, orders)
+    maze, orders = parse_puzzle_2(puzzle)
+    return move_robot_2(maze, orders)
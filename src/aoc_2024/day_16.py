@@ -4,46 +4,50 @@ from collections.abc import Iterator, Mapping
 from typing import Any
 
 from aoc.a_star import Cost, Heuristic, Neighbors, a_star
-from aoc.datatypes import Coord, Direction
 from aoc.exceptions import UnsolveableError
 from aoc.puzzle import PuzzleInput
-from tqdm import tqdm
 
+from aoc_2024.grid import EAST, NORTH, SOUTH, WEST, Grid
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.progress import progress
+from aoc_2024.render import emit, overlay
 
-class ReindeerHeuristic(Heuristic[Coord]):
-    def __call__(self, current: Coord, goal: Coord) -> float:
-        return abs(current.row - goal.row) + abs(current.col - goal.col)
+WALL = ord("#")
 
 
-class ReindeerNeighbors(Neighbors[Coord]):
-    def __init__(self, maze: set[Coord]) -> None:
+class ReindeerHeuristic(Heuristic[int]):
+    def __init__(self, maze: Grid) -> None:
+        self.cols = maze.cols
+
+    def __call__(self, current: int, goal: int) -> float:
+        current_row, current_col = divmod(current, self.cols)
+        goal_row, goal_col = divmod(goal, self.cols)
+        return abs(current_row - goal_row) + abs(current_col - goal_col)
+
+
+class ReindeerNeighbors(Neighbors[int]):
+    def __init__(self, maze: Grid) -> None:
         self.maze = maze
 
-    def __call__(self, current: Coord, paths: Mapping[Coord, Coord]) -> Iterator[Coord]:
-        for direction in (
-            Direction.NORTH,
-            Direction.SOUTH,
-            Direction.EAST,
-            Direction.WEST,
-        ):
-            neighbor = current + direction
-            if neighbor in self.maze:
+    def __call__(self, current: int, paths: Mapping[int, int]) -> Iterator[int]:
+        for neighbor in self.maze.neighbors(current):
+            if self.maze[neighbor] == WALL:
                 continue
             if neighbor in paths:
                 continue
             yield neighbor
 
 
-class ReindeerCost(Cost[Coord]):
-    def __call__(
-        self, paths: Mapping[Coord, Coord], current: Coord, last: Coord
-    ) -> float:
+class ReindeerCost(Cost[int]):
+    def __call__(self, paths: Mapping[int, int], current: int, last: int) -> float:
+        # Cells are flat indices, so the difference between two cells is the
+        # offset of the step taken. The reindeer starts facing east.
         new_facing = current - last
-        prior = paths.get(last, last - Coord(0, 1))
+        prior = paths.get(last, last - 1)
 
         facing = None
         if prior is None:
-            facing = Coord(0, 1)
+            facing = 1
         else:
             facing = last - prior
 
@@ -52,48 +56,33 @@ class ReindeerCost(Cost[Coord]):
         return 1001.0
 
 
-def parse(puzzle: PuzzleInput) -> tuple[set[Coord], Coord, Coord]:
-    r = None
-    end = None
-    walls = set()
-    for row, line in enumerate(puzzle.lines):
-        for col, char in enumerate(line):
-            current = Coord(row, col)
-            match char:
-                case "S":
-                    r = current
-                case "E":
-                    end = current
-                case "#":
-                    walls.add(current)
-    if r is None or end is None:
-        raise ValueError
-
-    return walls, r, end
+@cached_parse
+def parse(puzzle: PuzzleInput) -> tuple[Grid, int, int]:
+    maze = Grid.from_lines(puzzle.lines)
+    return maze, maze.find("S"), maze.find("E")
 
 
 def part_1(puzzle: PuzzleInput) -> Any:
     maze, start, end = parse(puzzle)
-    rh = ReindeerHeuristic()
+    rh = ReindeerHeuristic(maze)
     rc = ReindeerCost()
     rn = ReindeerNeighbors(maze)
     _, cost = a_star(start, end, rh, rc, rn)
     return int(cost)
 
 
-def find_all_fastest_wrong(maze: set[Coord], start: Coord, end: Coord) -> int:
+def find_all_fastest_wrong(maze: Grid, start: int, end: int) -> int:
     """
     I left this in because it works on the full puzzle input but fails on the tests.
     It's incorrect.
     """
-    rh = ReindeerHeuristic()
+    rh = ReindeerHeuristic(maze)
     rc = ReindeerCost()
     rn = ReindeerNeighbors(maze)
     path, cost = a_star(start, end, rh, rc, rn)
     seen = set(path)
-    for i in tqdm(range(1, len(path) - 1)):
-        new_maze = maze.copy()
-        new_maze.add(path[i])
+    for i in progress(range(1, len(path) - 1), "walls"):
+        new_maze = maze.replace(path[i], "#")
         rn = ReindeerNeighbors(new_maze)
         try:
             new_path, new_cost = a_star(start, end, rh, rc, rn)
@@ -104,15 +93,7 @@ def find_all_fastest_wrong(maze: set[Coord], start: Coord, end: Coord) -> int:
             continue
 
         seen.update(new_path)
-    for row in range(15):
-        for col in range(15):
-            current = Coord(row, col)
-            if current in maze:
-                print("#", end="")
-            elif current in seen:
-                print("O", end="")
-            else:
-                print(".", end="")
+    emit("Seats", lambda: overlay(maze, seen, "O"))
     return len(seen)
 
 
@@ -121,9 +102,9 @@ def part_2_alt(puzzle: PuzzleInput) -> Any:
     return find_all_fastest_wrong(maze, start, end)
 
 
-def bfs(maze: set[Coord], start: Coord, end: Coord, target_cost: int) -> int:
-    iterations = [(start, [], Direction.EAST, 0)]
-    fastest: dict[tuple[Coord, Direction], float] = defaultdict(lambda: math.inf)
+def bfs(maze: Grid, start: int, end: int, target_cost: int) -> int:
+    iterations = [(start, [], EAST, 0)]
+    fastest: dict[tuple[int, int], float] = defaultdict(lambda: math.inf)
     done = False
     paths = []
     while not done:
@@ -140,15 +121,16 @@ def bfs(maze: set[Coord], start: Coord, end: Coord, target_cost: int) -> int:
                     continue
 
             possibles = []
-            if current + dir not in maze:
-                possibles.append((current + dir, [*path, current], dir, cost + 1))
+            ahead = maze.step(current, dir)
+            if ahead is not None and maze[ahead] != WALL:
+                possibles.append((ahead, [*path, current], dir, cost + 1))
 
-            if dir in (Direction.EAST, Direction.WEST):
-                possibles.append((current, path, Direction.NORTH, cost + 1000))
-                possibles.append((current, path, Direction.SOUTH, cost + 1000))
+            if dir in (EAST, WEST):
+                possibles.append((current, path, NORTH, cost + 1000))
+                possibles.append((current, path, SOUTH, cost + 1000))
             else:
-                possibles.append((current, path, Direction.EAST, cost + 1000))
-                possibles.append((current, path, Direction.WEST, cost + 1000))
+                possibles.append((current, path, EAST, cost + 1000))
+                possibles.append((current, path, WEST, cost + 1000))
 
             for p in possibles:
                 if fastest[(p[0], p[2])] >= p[3]:
@@ -160,22 +142,13 @@ def bfs(maze: set[Coord], start: Coord, end: Coord, target_cost: int) -> int:
     all_paths = set()
     for path in paths:
         all_paths.update(set(path))
-    for row in range(15):
-        for col in range(15):
-            current = Coord(row, col)
-            if current in maze:
-                print("#", end="")
-            elif current in all_paths:
-                print("O", end="")
-            else:
-                print(".", end="")
-        print()
+    emit("Seats", lambda: overlay(maze, all_paths, "O"))
     return len(all_paths)
 
 
 def part_2(puzzle: PuzzleInput) -> Any:
     maze, start, end = parse(puzzle)
-    rh = ReindeerHeuristic()
+    rh = ReindeerHeuristic(maze)
     rc = ReindeerCost()
     rn = ReindeerNeighbors(maze)
     _, cost = a_star(start, end, rh, rc, rn)
@@ -1,107 +1,95 @@
-from collections.abc import Iterator
-from typing import Any, Mapping
+from collections.abc import Iterator, Mapping
+from typing import Any
 
 from aoc.a_star import Cost, Heuristic, Neighbors, a_star
 from aoc.datatypes import Coord
 from aoc.exceptions import UnsolveableError
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.grid import Grid
 
-def parse_1(puzzle: PuzzleInput) -> tuple[set[Coord], Coord]:
+WALL = ord("#")
+
+
+def get_size(puzzle: PuzzleInput) -> Coord:
     if puzzle.test:
-        size = Coord(7, 7)
-        cutoff = 12
-    else:
-        size = Coord(71, 71)
-        cutoff = 1024
+        return Coord(7, 7)
+    return Coord(71, 71)
+
+
+def parse_block(line: str, size: Coord) -> int:
+    x, y = line.split(",", 1)
+    return int(y) * size.col + int(x)
+
+
+def parse_1(puzzle: PuzzleInput) -> Grid:
+    size = get_size(puzzle)
+    cutoff = 12 if puzzle.test else 1024
 
-    maze = set()
+    maze = bytearray(b"." * (size.row * size.col))
     for line in puzzle.lines[:cutoff]:
-        x, y = line.split(",", 1)
-        current = Coord(int(y), int(x))
-        maze.add(current)
+        maze[parse_block(line, size)] = WALL
 
-    return maze, size
+    return Grid(size.row, size.col, bytes(maze))
 
 
-class MazeHeuristic(Heuristic[Coord]):
-    def __call__(self, current: Coord, target: Coord) -> float:
-        row_diff = abs((current - target).row)
-        col_diff = abs((current - target).col)
-        return float(row_diff + col_diff)
+class MazeHeuristic(Heuristic[int]):
+    def __init__(self, maze: Grid) -> None:
+        self.cols = maze.cols
 
+    def __call__(self, current: int, target: int) -> float:
+        current_row, current_col = divmod(current, self.cols)
+        target_row, target_col = divmod(target, self.cols)
+        return float(abs(current_row - target_row) + abs(current_col - target_col))
 
-class MazeNeighbors(Neighbors[Coord]):
-    def __init__(self, maze: set[Coord], size: Coord) -> None:
+
+class MazeNeighbors(Neighbors[int]):
+    def __init__(self, maze: Grid) -> None:
         self.maze = maze
-        self.size = size
-
-    def __call__(self, current: Coord, paths: Mapping[Coord, Coord]) -> Iterator[Coord]:  # noqa: ARG002
-        for potential_neighbor in [
-            Coord(-1, 0),
-            Coord(1, 0),
-            Coord(0, -1),
-            Coord(0, 1),
-        ]:
-            neighbor = current + potential_neighbor
-            if (
-                neighbor.row < 0
-                or neighbor.col < 0
-                or neighbor.row >= self.size.row
-                or neighbor.col >= self.size.col
-            ):
-                continue
-            if neighbor not in self.maze and neighbor not in paths:
+
+    def __call__(self, current: int, paths: Mapping[int, int]) -> Iterator[int]:
+        for neighbor in self.maze.neighbors(current):
+            if self.maze[neighbor] != WALL and neighbor not in paths:
                 yield neighbor
 
 
-class MazeCost(Cost[Coord]):
-    def __call__(
-        self, paths: Mapping[Coord, Coord], current: Coord, last: Coord
-    ) -> float:  # noqa: ARG002
+class MazeCost(Cost[int]):
+    def __call__(self, paths: Mapping[int, int], current: int, last: int) -> float:  # noqa: ARG002
         return 1
 
 
 def part_1(puzzle: PuzzleInput) -> Any:
-    maze, size = parse_1(puzzle)
-    heuristic = MazeHeuristic()
-    neighbor_func = MazeNeighbors(maze, size)
+    maze = parse_1(puzzle)
+    heuristic = MazeHeuristic(maze)
+    neighbor_func = MazeNeighbors(maze)
     cost_func = MazeCost()
-    _, cost = a_star(
-        Coord(0, 0), size - Coord(1, 1), heuristic, cost_func, neighbor_func
-    )
+    _, cost = a_star(0, len(maze) - 1, heuristic, cost_func, neighbor_func)
     return int(cost)
 
 
-def get_size(puzzle) -> Coord:
-    if puzzle.test:
-        return Coord(7, 7)
-    return Coord(71, 71)
-
-
-def get_memory_block(puzzle: PuzzleInput) -> Iterator[Coord]:
+def get_memory_block(puzzle: PuzzleInput, size: Coord) -> Iterator[int]:
     for i in range(len(puzzle.lines)):
         for line in puzzle.lines[:i]:
-            x, y = line.split(",", 1)
-            current = Coord(int(y), int(x))
-            yield current
+            yield parse_block(line, size)
 
 
 def part_2(puzzle: PuzzleInput) -> Any:
     size = get_size(puzzle)
-    heuristic = MazeHeuristic()
+    maze = Grid.filled(size.row, size.col)
+    heuristic = MazeHeuristic(maze)
     cost_func = MazeCost()
-    maze = set()
     last_path = None
-    for block in get_memory_block(puzzle):
-        maze.add(block)
+    for block in get_memory_block(puzzle, size):
+        if maze[block] == WALL:
+            continue
+        maze = maze.replace(block, "#")
         if last_path is not None and block not in last_path:
             continue
 
-        neighbor_func = MazeNeighbors(maze, size)
+        neighbor_func = MazeNeighbors(maze)
         try:
-            last_path, _ = a_star(
-                Coord(0, 0), size - Coord(1, 1), heuristic, cost_func, neighbor_func
-            )
+            path, _ = a_star(0, len(maze) - 1, heuristic, cost_func, neighbor_func)
+            last_path = set(path)
         except UnsolveableError:
-            return str(block.col) + "," + str(block.row)
+            row, col = divmod(block, size.col)
+            return str(col) + "," + str(row)
@@ -1,11 +1,15 @@
 import functools
+from collections.abc import Sequence
 from typing import Any
 
 from aoc.puzzle import PuzzleInput
-from tqdm import tqdm
 
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.progress import progress
 
-def parse(puzzle: PuzzleInput) -> tuple[list[str], list[str]]:
+
+@cached_parse
+def parse(puzzle: PuzzleInput) -> tuple[Sequence[str], Sequence[str]]:
     towels = []
     for towel in puzzle.lines[0].split(", "):
         towels.append(towel)
@@ -26,16 +30,16 @@ def towel_possible(pattern: str, towels: tuple[str]) -> bool:
     return False
 
 
-def towels_possible(patterns: list[str], towels: list[str]) -> int:
+def towels_possible(patterns: Sequence[str], towels: Sequence[str]) -> int:
     total = 0
-    for pattern in tqdm(patterns):
+    for pattern in progress(patterns, "patterns"):
         if towel_possible(pattern, tuple(towels)):
             total += 1
 
     return total
 
 
-def relevant_towels(towels: list[str]) -> list[str]:
+def relevant_towels(towels: Sequence[str]) -> list[str]:
     single_letter_towels = {x for x in towels if len(x) == 1}
     remaining = [x for x in towels if not set(x).issubset(single_letter_towels)]
 
@@ -78,7 +82,7 @@ def part_2(puzzle: PuzzleInput) -> Any:
     towels, patterns = parse(puzzle)
     relevant = relevant_towels(towels)
     total = 0
-    for pattern in tqdm(patterns):
+    for pattern in progress(patterns, "patterns"):
         if towel_possible(pattern, tuple(relevant)) is not None:
             total += towel_permutations(pattern, tuple(towels))
     return total
@@ -1,38 +1,195 @@
+from collections.abc import Iterable, Iterator, Sequence
 from typing import Any
 
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.streaming import AnyInput, StreamingInput, iter_lines
 
-def parse_input(puzzle: PuzzleInput) -> list[list[int]]:
-    reports = []
-    for line in puzzle.lines:
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+
+@cached_parse
+def parse_input(puzzle: AnyInput) -> Iterator[Sequence[int]]:
+    for line in iter_lines(puzzle):
         items = line.split(" ")
-        reports.append([int(x) for x in items])
-    return reports
+        yield [int(x) for x in items]
+
+
+def check_report(report: Sequence[int]) -> tuple[bool, bool]:
+    """
+    Whether a report is safe, and whether it is safe with at most one level
+    removed, in a single pass. Increasing and decreasing are tracked at the
+    same time, each with three states: nothing removed so far, a level before
+    the current one removed, or the current level removed.
+    """
+    up, up_removed, up_skipped = True, False, True
+    down, down_removed, down_skipped = True, False, True
+    before = None
+    last = report[0] if report else 0
+    for level in report[1:]:
+        step = level - last
+        # Stepping over the last level, when it was the one removed.
+        skip_step = None if before is None else level - before
+        up, up_removed, up_skipped = (
+            up and 1 <= step <= 3,
+            (up_removed and 1 <= step <= 3)
+            or (up_skipped and (skip_step is None or 1 <= skip_step <= 3)),
+            up,
+        )
+        down, down_removed, down_skipped = (
+            down and -3 <= step <= -1,
+            (down_removed and -3 <= step <= -1)
+            or (down_skipped and (skip_step is None or -3 <= skip_step <= -1)),
+            down,
+        )
+        if not (up_removed or up_skipped or down_removed or down_skipped):
+            return False, False
+        before, last = last, level
+    safe = up or down
+    return safe, safe or up_removed or up_skipped or down_removed or down_skipped
+
+
+def is_safe(report: Sequence[int]) -> bool:
+    return check_report(report)[0]
+
+
+def is_mostly_safe(report: Sequence[int]) -> bool:
+    return check_report(report)[1]
+
+
+def count_safe(reports: Iterable[Sequence[int]]) -> tuple[int, int]:
+    """The number of safe reports for both parts in one traversal."""
+    safe = mostly_safe = 0
+    for report in reports:
+        strict, dampened = check_report(report)
+        safe += strict
+        mostly_safe += dampened
+    return safe, mostly_safe
+
 
+@cached_parse
+def parse_csr(puzzle: PuzzleInput) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    All levels in one flat int64 array, plus offsets where report k is
+    levels[offsets[k]:offsets[k + 1]].
+    """
+    # Trailing newlines are dropped like lines does, they'd be empty reports.
+    raw = puzzle.raw.rstrip("\n")
+    if not raw:
+        levels, offsets = np.zeros(0, dtype=np.int64), np.zeros(1, dtype=np.int64)
+        levels.flags.writeable = False
+        offsets.flags.writeable = False
+        return levels, offsets
+    levels = np.fromstring(raw, dtype=np.int64, sep=" ")
+    text = np.frombuffer(raw.encode(), dtype=np.uint8)
 
-def is_safe(report: list[int]) -> bool:
-    diffs = []
-    for i in range(len(report) - 1):
-        diffs.append(report[i] - report[i + 1])
+    # Every report has one more level than it has spaces.
+    line_ends = np.flatnonzero(text == ord("\n"))
+    if not len(text) or text[-1] != ord("\n"):
+        line_ends = np.append(line_ends, len(text))
+    spaces = np.flatnonzero(text == ord(" "))
+    lengths = np.diff(np.searchsorted(spaces, line_ends), prepend=0) + 1
 
-    all_increasing = True
-    for i in diffs:
-        if i < 1 or i > 3:
-            all_increasing = False
-    if all_increasing is True:
-        return True
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if offsets[-1] != len(levels):
+        msg = "Reports have something other than levels in them."
+        raise ValueError(msg)
+    levels.flags.writeable = False
+    offsets.flags.writeable = False
+    return levels, offsets
 
-    all_decreasing = True
-    for i in diffs:
-        if i < -3 or i > -1:
-            all_decreasing = False
-    if all_decreasing is True:
-        return True
-    return False
 
+def in_range(steps: "np.ndarray", low: int, high: int) -> "np.ndarray":
+    within: np.ndarray = (steps >= low) & (steps <= high)
+    return within
 
-def part_1(puzzle: PuzzleInput) -> Any:
+
+def can_skip(
+    levels: "np.ndarray",
+    offsets: "np.ndarray",
+    level: "np.ndarray",
+    low: int,
+    high: int,
+) -> "np.ndarray":
+    """
+    Per report, whether taking out the given level leaves a good step from the
+    level before it to the one after.
+    """
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    at = starts + level
+    inner = (level > 0) & (level < lengths - 1)
+    last = len(levels) - 1
+    over = levels[np.clip(at + 1, 0, last)] - levels[np.clip(at - 1, 0, last)]
+    skippable: np.ndarray = ~inner | in_range(over, low, high)
+    return skippable
+
+
+def check_reports_csr(
+    levels: "np.ndarray", offsets: "np.ndarray"
+) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    Vectorized check_report for every report at once. A report is safe with a
+    level removed if all its bad steps are next to one level, and stepping
+    over that level is fine or it is the first or last one.
+    """
+    count = len(offsets) - 1
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    steps = np.diff(levels)
+    # Steps from the last level of one report to the first of the next.
+    crossing = np.zeros(len(steps), dtype=bool)
+    crossing[offsets[1:-1] - 1] = True
+    # Steps and levels are indexed from the start of their report.
+    report = np.repeat(np.arange(count), lengths)
+    local = np.arange(len(levels)) - starts[report]
+
+    safe = np.zeros(count, dtype=bool)
+    mostly_safe = lengths <= 2
+    # Reports with a single level have no steps to reduce over.
+    has_steps = lengths > 1
+    segments = starts[has_steps]
+    big = np.iinfo(np.int64).max
+    for low, high in ((1, 3), (-3, -1)):
+        bad = ~in_range(steps, low, high) & ~crossing
+        first = np.full(count, big)
+        last = np.full(count, -1)
+        if len(steps):
+            first[has_steps] = np.minimum.reduceat(
+                np.where(bad, local[:-1], big), segments
+            )
+            last[has_steps] = np.maximum.reduceat(
+                np.where(bad, local[:-1], -1), segments
+            )
+        clean = first == big
+        safe |= clean
+
+        first_level = np.where(clean, 0, first)
+        mostly_safe |= (
+            clean
+            | ((last == first) & can_skip(levels, offsets, first_level, low, high))
+            | (
+                ((last == first) | (last == first + 1))
+                & can_skip(levels, offsets, first_level + 1, low, high)
+            )
+        )
+    return safe, mostly_safe
+
+
+def count_safe_csr(levels: "np.ndarray", offsets: "np.ndarray") -> tuple[int, int]:
+    safe, mostly_safe = check_reports_csr(levels, offsets)
+    return int(np.count_nonzero(safe)), int(np.count_nonzero(mostly_safe))
+
+
+def part_1(puzzle: AnyInput) -> Any:
+    # Streamed inputs are checked a report at a time to stay in constant memory.
+    if isinstance(puzzle, StreamingInput):
+        return count_safe(parse_input(puzzle))[0]
+    if np is not None:
+        return count_safe_csr(*parse_csr(puzzle))[0]
     reports = parse_input(puzzle)
     total = 0
     for report in reports:
@@ -40,19 +197,12 @@ def part_1(puzzle: PuzzleInput) -> Any:
     return total
 
 
-def is_mostly_safe(report: list[int]) -> bool:
-    if is_safe(report):
-        return True
-
-    for i in range(len(report)):
-        without = report.copy()
-        del without[i]
-        if is_safe(without) is True:
-            return True
-    return False
-
-
-def part_2(puzzle: PuzzleInput) -> Any:
+def part_2(puzzle: AnyInput) -> Any:
+    # Streamed inputs are checked a report at a time to stay in constant memory.
+    if isinstance(puzzle, StreamingInput):
+        return count_safe(parse_input(puzzle))[1]
+    if np is not None:
+        return count_safe_csr(*parse_csr(puzzle))[1]
     reports = parse_input(puzzle)
     total = 0
     for report in reports:
@@ -1,90 +1,30 @@
-import itertools
 import math
-from typing import Any, Iterator, Mapping
+from typing import Any
 
-from aoc.a_star import Cost, Heuristic, Neighbors, a_star
-from aoc.datatypes import Coord
 from aoc.puzzle import PuzzleInput
-from tqdm import tqdm
-
-
-def parse(puzzle: PuzzleInput) -> tuple[Coord, Coord, Coord, set[Coord]]:
-    start = end = None
-    maze = set()
-    size = Coord(len(puzzle.lines), len(puzzle.lines[0]))
-    for row, line in enumerate(puzzle.lines):
-        for col, char in enumerate(line):
-            current = Coord(row, col)
-            match char:
-                case "S":
-                    start = current
-                case "E":
-                    end = current
-                case "#":
-                    maze.add(current)
-    if start is None or end is None:
-        raise ValueError
-
-    return start, end, size, maze
-
-
-class MazeHeuristic(Heuristic[Coord]):
-    def __call__(self, current: Coord, target: Coord) -> float:
-        row_diff = abs((current - target).row)
-        col_diff = abs((current - target).col)
-        return float(row_diff + col_diff)
-
-
-class MazeNeighbors(Neighbors[Coord]):
-    def __init__(self, maze: set[Coord], size: Coord) -> None:
-        self.maze = maze
-        self.size = size
-
-    def __call__(self, current: Coord, paths: Mapping[Coord, Coord]) -> Iterator[Coord]:  # noqa: ARG002
-        for potential_neighbor in [
-            Coord(-1, 0),
-            Coord(1, 0),
-            Coord(0, -1),
-            Coord(0, 1),
-        ]:
-            neighbor = current + potential_neighbor
-            if (
-                neighbor.row < 0
-                or neighbor.col < 0
-                or neighbor.row >= self.size.row
-                or neighbor.col >= self.size.col
-            ):
-                continue
-            if neighbor not in self.maze:
-                yield neighbor
 
+from aoc_2024.grid import Grid
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.progress import progress
+
+WALL = ord("#")
 
-class MazeCost(Cost[Coord]):
-    def __call__(
-        self, paths: Mapping[Coord, Coord], current: Coord, last: Coord
-    ) -> float:  # noqa: ARG002
-        return 1
 
+@cached_parse
+def parse(puzzle: PuzzleInput) -> tuple[int, int, Grid]:
+    maze = Grid.from_lines(puzzle.lines)
+    return maze.find("S"), maze.find("E"), maze
 
-def get_removable_walls(maze: set[Coord], size: Coord) -> set[Coord]:
+
+def get_removable_walls(maze: Grid) -> set[int]:
     removable = set()
-    for wall in maze:
-        if (
-            wall.row == 0
-            or wall.col == 0
-            or wall.row == size.row - 1
-            or wall.col == size.col - 1
-        ):
+    for wall in maze.find_all("#"):
+        row, col = divmod(wall, maze.cols)
+        if row == 0 or col == 0 or row == maze.rows - 1 or col == maze.cols - 1:
             continue
         free = 0
-        for surrounding in [
-            Coord(-1, 0),
-            Coord(1, 0),
-            Coord(0, -1),
-            Coord(0, 1),
-        ]:
-            current = wall + surrounding
-            if current not in maze:
+        for current in maze.neighbors(wall):
+            if maze[current] != WALL:
                 free += 1
 
         if free > 1:
@@ -92,75 +32,38 @@ def get_removable_walls(maze: set[Coord], size: Coord) -> set[Coord]:
     return removable
 
 
-def precompute_path(
-    start: Coord, end: Coord, size: Coord, maze: set[Coord]
-) -> dict[Coord, tuple[int, int]]:
-    neighbor_func = MazeNeighbors(maze, size)
-
-    start_path_cache = {}
-    end_path_cache = {}
-
-    frontier = {start}
-    seen = {start}
-    steps = 0
+def distances(start: int, maze: Grid) -> list[int]:
+    """Steps from start to every cell, -1 for cells that can't be reached."""
+    steps = [-1] * len(maze)
+    steps[start] = 0
+    frontier = [start]
     while frontier:
-        next_frontier = set()
+        next_frontier = []
         for current in frontier:
-            start_path_cache[current] = steps
-            for neighbor in neighbor_func(current, {}):
-                if neighbor in seen:
+            for neighbor in maze.neighbors(current):
+                if steps[neighbor] != -1 or maze[neighbor] == WALL:
                     continue
-                next_frontier.add(neighbor)
-                seen.add(neighbor)
+                steps[neighbor] = steps[current] + 1
+                next_frontier.append(neighbor)
         frontier = next_frontier
-        steps += 1
+    return steps
 
-    frontier = {end}
-    seen = {end}
-    steps = 0
-    while frontier:
-        next_frontier = set()
-        for current in frontier:
-            end_path_cache[current] = steps
-            for neighbor in neighbor_func(current, {}):
-                if neighbor in seen:
-                    continue
-                next_frontier.add(neighbor)
-                seen.add(neighbor)
-        frontier = next_frontier
-        steps += 1
-
-    path_cache = {}
-    for coord in start_path_cache.keys():
-        path_cache[coord] = (start_path_cache[coord], end_path_cache[coord])
 
-    return path_cache
+def precompute_path(start: int, end: int, maze: Grid) -> tuple[list[int], list[int]]:
+    return distances(start, maze), distances(end, maze)
 
 
-def efficient_wall_removal(
-    start: Coord, end: Coord, size: Coord, maze: set[Coord]
-) -> int:
-    neighbor_func = MazeNeighbors(maze, size)
-    heuristic = MazeHeuristic()
-    cost_func = MazeCost()
-    _, cost = a_star(start, end, heuristic, cost_func, neighbor_func)
+def efficient_wall_removal(start: int, end: int, maze: Grid) -> int:
+    from_start, from_end = precompute_path(start, end, maze)
+    cost = from_start[end]
     total = 0
-    path_cache = precompute_path(start, end, size, maze)
-    for removable in tqdm(get_removable_walls(maze, size)):
+    for removable in progress(get_removable_walls(maze), "walls"):
         lowest_start = lowest_end = math.inf
-        for surrounding in [
-            Coord(-1, 0),
-            Coord(1, 0),
-            Coord(0, -1),
-            Coord(0, 1),
-        ]:
-            current = removable + surrounding
-            if current not in path_cache:
+        for current in maze.neighbors(removable):
+            if from_start[current] == -1:
                 continue
-            if path_cache[current][0] < lowest_start:
-                lowest_start = path_cache[current][0]
-            if path_cache[current][1] < lowest_end:
-                lowest_end = path_cache[current][1]
+            lowest_start = min(lowest_start, from_start[current])
+            lowest_end = min(lowest_end, from_end[current])
         if lowest_start == math.inf or lowest_end == math.inf:
             raise ValueError
 
@@ -172,28 +75,45 @@ def efficient_wall_removal(
 
 
 def part_1(puzzle: PuzzleInput) -> Any:
-    start, end, size, maze = parse(puzzle)
-    return efficient_wall_removal(start, end, size, maze)
+    start, end, maze = parse(puzzle)
+    return efficient_wall_removal(start, end, maze)
+
+
+def cheat_offsets(maze: Grid, max_dist: int) -> list[tuple[int, int, int, int]]:
+    """(row step, col step, flat offset, distance) for every cell within reach."""
+    offsets = []
+    for d_row in range(-max_dist, max_dist + 1):
+        remaining = max_dist - abs(d_row)
+        for d_col in range(-remaining, remaining + 1):
+            dist = abs(d_row) + abs(d_col)
+            if dist == 0:
+                continue
+            offsets.append((d_row, d_col, d_row * maze.cols + d_col, dist))
+    return offsets
 
 
-def big_cheat(start: Coord, end: Coord, size: Coord, maze: set[Coord]) -> int:
-    neighbor_func = MazeNeighbors(maze, size)
-    heuristic = MazeHeuristic()
-    cost_func = MazeCost()
-    _, cost = a_star(start, end, heuristic, cost_func, neighbor_func)
-    path_cache = precompute_path(start, end, size, maze)
+def big_cheat(start: int, end: int, maze: Grid) -> int:
+    from_start, from_end = precompute_path(start, end, maze)
+    cost = from_start[end]
+    offsets = cheat_offsets(maze, 20)
     total = 0
-    for start, end in itertools.permutations(path_cache.keys(), 2):
-        dist = abs(start.row - end.row) + abs(start.col - end.col)
-        if dist > 20:
+    for cheat_start, start_steps in enumerate(from_start):
+        if start_steps == -1:
             continue
+        row, col = divmod(cheat_start, maze.cols)
+        for d_row, d_col, offset, dist in offsets:
+            if not (0 <= row + d_row < maze.rows and 0 <= col + d_col < maze.cols):
+                continue
+            end_steps = from_end[cheat_start + offset]
+            if end_steps == -1:
+                continue
 
-        new_cost = path_cache[start][0] + path_cache[end][1] + dist
-        if cost - new_cost >= 100:
-            total += 1
+            new_cost = start_steps + end_steps + dist
+            if cost - new_cost >= 100:
+                total += 1
     return total
 
 
 def part_2(puzzle: PuzzleInput) -> Any:
-    start, end, size, maze = parse(puzzle)
-    return big_cheat(start, end, size, maze)
+    start, end, maze = parse(puzzle)
+    return big_cheat(start, end, maze)
@@ -1,14 +1,13 @@
 from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
 from typing import Any
 
-from aoc.puzzle import PuzzleInput
+from aoc_2024.streaming import AnyInput, iter_lines
 
 
-def parse(puzzle: PuzzleInput) -> list[int]:
-    nums = []
-    for line in puzzle.lines:
-        nums.append(int(line))
-    return nums
+def parse(puzzle: AnyInput) -> Iterator[int]:
+    for line in iter_lines(puzzle):
+        yield int(line)
 
 
 def operate(num: int) -> int:
@@ -26,10 +25,9 @@ def operate(num: int) -> int:
     return num
 
 
-def part_1(puzzle: PuzzleInput) -> Any:
+def part_1(puzzle: AnyInput) -> Any:
     total = 0
-    for line in puzzle.lines:
-        num = int(line)
+    for num in parse(puzzle):
         for _ in range(2000):
             num = operate(num)
         total += num
@@ -56,7 +54,7 @@ def get_sequences(num: int) -> dict[tuple[int, int, int, int], int]:
     return prices
 
 
-def merge_sequences(nums: list[int]) -> int:
+def merge_sequences(nums: Iterable[int]) -> int:
     prices = defaultdict(int)
     for num in nums:
         new_prices = get_sequences(num)
@@ -65,6 +63,6 @@ def merge_sequences(nums: list[int]) -> int:
     return max(prices.values())
 
 
-def part_2(puzzle: PuzzleInput) -> Any:
+def part_2(puzzle: AnyInput) -> Any:
     nums = parse(puzzle)
     return merge_sequences(nums)
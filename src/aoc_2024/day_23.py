@@ -1,12 +1,16 @@
 import itertools
-import time
 from collections import defaultdict
+from collections.abc import Mapping, Sequence
 from typing import Any
 
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.profiling import span
 
-def parse(puzzle: PuzzleInput) -> dict[str, list[str]]:
+
+@cached_parse
+def parse(puzzle: PuzzleInput) -> Mapping[str, Sequence[str]]:
     network = defaultdict(list)
     for line in puzzle.lines:
         a, b = line.split("-")
@@ -26,24 +30,7 @@ def part_1(puzzle: PuzzleInput) -> Any:
     return len(lan)
 
 
-def maximal_clique_polynomial(graph: dict[str, list[str]]) -> frozenset[str]:
-    """Faster brute force maximal clique"""
-    largest_mc = frozenset()
-    for vertex in graph:
-        current_mc = {vertex}
-        for neighbor in graph[vertex]:
-            connected = True
-            for mcs in current_mc:
-                if mcs not in graph[neighbor]:
-                    connected = False
-            if connected is True:
-                current_mc.add(neighbor)
-        if len(current_mc) > len(largest_mc):
-            largest_mc = frozenset(current_mc)
-    return largest_mc
-
-
-def color_classes(graph: dict[str, list[str]]) -> dict[str, int]:
+def color_classes(graph: Mapping[str, Sequence[str]]) -> dict[str, int]:
     colors = defaultdict(set)
     for vertex in graph:
         i = 1
@@ -60,7 +47,7 @@ def color_classes(graph: dict[str, list[str]]) -> dict[str, int]:
 
 
 def max_clique_2003(
-    graph: dict[str, list[str]], coloring: dict[str, int]
+    graph: Mapping[str, Sequence[str]], coloring: dict[str, int]
 ) -> frozenset[str]:
     clique = set()
     max_clique = frozenset()
@@ -89,23 +76,8 @@ def max_clique_2003(
 
 def part_2(puzzle: PuzzleInput) -> Any:
     network = parse(puzzle)
-    start = time.time()
-    res = ",".join(sorted(list(maximal_clique_polynomial(network))))
-    end = time.time()
-    total_time = end - start
-    print(res)
-    print("Time taken:", total_time)
-    start = time.time()
-    color = color_classes(network)
-    res = ",".join(sorted(list(max_clique_2003(network, color))))
-    end = time.time()
-    total_time = end - start
-    print(res)
-    print("Time taken:", total_time)
-    start = time.time()
-    res = ",".join(sorted(list(max_clique_bruteforce(network))))
-    end = time.time()
-    total_time = end - start
-    print(res)
-    print("Time taken:", total_time)
-    return res
+    with span("color_classes"):
+        color = color_classes(network)
+    with span("max_clique_2003"):
+        clique = max_clique_2003(network, color)
+    return ",".join(sorted(clique))
@@ -1,37 +1,99 @@
+import mmap
+import os
 import re
-from typing import Any
+from collections.abc import Buffer
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
 
-from aoc.puzzle import PuzzleInput
+from aoc_2024.streaming import AnyInput, StreamingInput
 
+PATTERN = re.compile(rb"mul\((\d{1,3}),(\d{1,3})\)|(do\(\))|(don't\(\))")
+# A match starting just before the end of a chunk may run this far past it.
+OVERLAP = len(b"mul(123,456)") - 1
+PARALLEL_THRESHOLD = 8 * 2**20
+MIN_CHUNK = 2**20
 
-def part_1(puzzle: PuzzleInput) -> Any:
-    pattern = r"mul\((\d{1,3}),(\d{1,3})\)"
-    multiplications = []
-    for line in puzzle.lines:
-        matches = re.findall(pattern, line)
-        multiplications.extend(matches)
-    total = 0
 
-    for a, b in multiplications:
-        total += int(a) * int(b)
-    return total
+class ChunkScan(NamedTuple):
+    """
+    The sums of one chunk. Since a chunk doesn't know if multiplications are
+    enabled when it starts, it sums for both cases, and records the state it
+    leaves behind, None when it has no do() or don't().
+    """
 
+    total: int
+    if_enabled: int
+    if_disabled: int
+    ends_enabled: bool | None
 
-def part_2(puzzle: PuzzleInput) -> Any:
-    pattern = r"mul\((\d{1,3}),(\d{1,3})\)|(do\(\))|(don't\(\))"
-    multiplications = []
+
+def scan(buffer: Buffer, start: int, end: int) -> ChunkScan:
+    """Scan the matches that start in buffer[start:end]."""
+    total = if_enabled = if_disabled = 0
+    enabled_start, disabled_start = True, False
+    ends_enabled = None
+    stop = min(end + OVERLAP, len(memoryview(buffer)))
+    for match in PATTERN.finditer(buffer, start, stop):
+        if match.start() >= end:
+            break
+        left, right, enable, disable = match.groups()
+        if enable is not None:
+            enabled_start = disabled_start = ends_enabled = True
+        elif disable is not None:
+            enabled_start = disabled_start = ends_enabled = False
+        else:
+            product = int(left) * int(right)
+            total += product
+            if enabled_start:
+                if_enabled += product
+            if disabled_start:
+                if_disabled += product
+    return ChunkScan(total, if_enabled, if_disabled, ends_enabled)
+
+
+def scan_file(path: Path, start: int, end: int) -> ChunkScan:
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return scan(m, start, end)
+
+
+def combine(scans: list[ChunkScan]) -> tuple[int, int]:
+    """Totals for both parts, carrying the enabled state across chunks."""
+    total = enabled_total = 0
     enabled = True
-    for line in puzzle.lines:
-        matches = re.findall(pattern, line)
-        for left, right, enable, disable in matches:
-            if left != "" and right != "" and enabled is True:
-                multiplications.append((int(left), int(right)))
-            elif disable != "":
-                enabled = False
-            elif enable != "":
-                enabled = True
-
-    total = 0
-    for a, b in multiplications:
-        total += a * b
-    return total
+    for chunk in scans:
+        total += chunk.total
+        enabled_total += chunk.if_enabled if enabled else chunk.if_disabled
+        if chunk.ends_enabled is not None:
+            enabled = chunk.ends_enabled
+    return total, enabled_total
+
+
+def scan_parallel(path: Path, size: int, workers: int | None = None) -> tuple[int, int]:
+    """Scan a file in chunks across a process pool, each mapping it itself."""
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps them busy when some chunks are slower.
+    chunk = max(size // (workers * 4), MIN_CHUNK)
+    starts = range(0, size, chunk)
+    ends = [min(start + chunk, size) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        scans = list(pool.map(scan_file, [path] * len(starts), starts, ends))
+    return combine(scans)
+
+
+def scan_puzzle(puzzle: AnyInput) -> tuple[int, int]:
+    if isinstance(puzzle, StreamingInput):
+        size = len(puzzle.buffer)
+        if size >= PARALLEL_THRESHOLD:
+            return scan_parallel(puzzle.path, size)
+        return combine([scan(puzzle.buffer, 0, size)])
+    data = puzzle.raw.encode()
+    return combine([scan(data, 0, len(data))])
+
+
+def part_1(puzzle: AnyInput) -> Any:
+    return scan_puzzle(puzzle)[0]
+
+
+def part_2(puzzle: AnyInput) -> Any:
+    return scan_puzzle(puzzle)[1]
@@ -1,9 +1,38 @@
+from collections import Counter
+from collections.abc import Iterator, Sequence
 from typing import Any
 
 import regex as re
 from aoc.datatypes import Coord
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.aho_corasick import AhoCorasick
+from aoc_2024.grid import (
+    DIRECTIONS,
+    EAST,
+    NORTH,
+    NORTH_EAST,
+    NORTH_WEST,
+    SOUTH,
+    SOUTH_EAST,
+    SOUTH_WEST,
+    WEST,
+    Grid,
+)
+from aoc_2024.parse_cache import cached_parse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+OPPOSITE = {
+    EAST: WEST,
+    SOUTH: NORTH,
+    SOUTH_EAST: NORTH_WEST,
+    SOUTH_WEST: NORTH_EAST,
+}
+
 
 def get_diagonals(puzzle: PuzzleInput) -> list[str]:
     directions = [Coord(1, 0), Coord(0, 1)]
@@ -83,7 +112,131 @@ def count_xmas(lines: list[str]) -> int:
     return total
 
 
+@cached_parse
+def parse(puzzle: PuzzleInput) -> Grid:
+    return Grid.from_lines(puzzle.lines)
+
+
+def count_word(grid: Grid, word: str) -> int:
+    """Count the word in all 8 directions by stepping from each first letter."""
+    letters = word.encode()
+    total = 0
+    for start in grid.find_all(word[0]):
+        for direction in range(len(DIRECTIONS)):
+            offset = grid.offsets[direction]
+            current = start
+            for letter in letters[1:]:
+                if not grid.masks[current] >> direction & 1:
+                    break
+                current += offset
+                if grid[current] != letter:
+                    break
+            else:
+                total += 1
+    return total
+
+
+def as_array(grid: Grid) -> "np.ndarray":
+    return np.frombuffer(grid.cells, dtype=np.uint8).reshape(grid.rows, grid.cols)
+
+
+def count_word_numpy(letters: "np.ndarray", word: str) -> int:
+    """
+    Count the word in all 8 directions. For each direction the grid is cut
+    into one shifted view per letter, all covering the cells a word could start
+    at, and a start counts when every view has its letter there.
+    """
+    rows, cols = letters.shape
+    reach = len(word) - 1
+    total = 0
+    for step in DIRECTIONS:
+        # The starts that leave room for the whole word in this direction.
+        top, bottom = max(0, -step.row * reach), rows - max(0, step.row * reach)
+        left, right = max(0, -step.col * reach), cols - max(0, step.col * reach)
+        if top >= bottom or left >= right:
+            continue
+        found = np.ones((bottom - top, right - left), dtype=bool)
+        for i, letter in enumerate(word.encode()):
+            row, col = step.row * i, step.col * i
+            found &= (
+                letters[top + row : bottom + row, left + col : right + col] == letter
+            )
+        total += int(np.count_nonzero(found))
+    return total
+
+
+def direction_scans(grid: Grid) -> Iterator[tuple[int, bytes, int, int]]:
+    """
+    Every line of the grid going east, south, south east and south west, as
+    (direction, cells, first cell index, step between cells).
+    """
+    rows, cols = grid.rows, grid.cols
+    cells = grid.cells
+    starts = {
+        EAST: [(row * cols, cols) for row in range(rows)],
+        SOUTH: [(col, rows) for col in range(cols)],
+        SOUTH_EAST: [(col, min(rows, cols - col)) for col in range(cols)]
+        + [(row * cols, min(rows - row, cols)) for row in range(1, rows)],
+        SOUTH_WEST: [(col, min(rows, col + 1)) for col in range(cols)]
+        + [(row * cols + cols - 1, min(rows - row, cols)) for row in range(1, rows)],
+    }
+    for direction, lines in starts.items():
+        step = grid.offsets[direction]
+        for start, length in lines:
+            stop = start + (length - 1) * step + 1
+            yield (
+                direction,
+                cells[start:stop:step] if step else cells[start:stop],
+                start,
+                step,
+            )
+
+
+def find_words(grid: Grid, words: Sequence[str]) -> Iterator[tuple[int, int, int]]:
+    """
+    Every occurrence of every word in all 8 directions, as (word index, first
+    cell, direction). Each line is scanned once, for the words and the words
+    reversed, a reversed word found going one way is the word going the other.
+    """
+    patterns = [word.encode() for word in words]
+    patterns += [pattern[::-1] for pattern in patterns]
+    automaton = AhoCorasick(patterns)
+    for direction, line, start, step in direction_scans(grid):
+        opposite = OPPOSITE[direction]
+        for end, index in automaton.search(line):
+            if index < len(words):
+                first = start + (end - len(patterns[index])) * step
+                yield index, first, direction
+            else:
+                last = start + (end - 1) * step
+                yield index - len(words), last, opposite
+
+
+def count_words(grid: Grid, words: Sequence[str]) -> list[int]:
+    """How often each word occurs, in the order of words, repeats included."""
+    counts = Counter(index for index, _, _ in find_words(grid, words))
+    return [counts[index] for index in range(len(words))]
+
+
+def locate_words(grid: Grid, words: Sequence[str]) -> list[list[tuple[Coord, int]]]:
+    """
+    The first letter and direction of each occurrence of every word, in the
+    order of words.
+    """
+    found: list[list[tuple[Coord, int]]] = [[] for _ in words]
+    for index, first, direction in find_words(grid, words):
+        found[index].append((grid.coord(first), direction))
+    return found
+
+
 def part_1(puzzle: PuzzleInput) -> Any:
+    grid = parse(puzzle)
+    if np is not None:
+        return count_word_numpy(as_array(grid), "XMAS")
+    return count_word(grid, "XMAS")
+
+
+def part_1_regex(puzzle: PuzzleInput) -> Any:
     straights = get_straigts(puzzle)
     diagonals = get_diagonals(puzzle)
     num_straight = count_xmas(straights)
@@ -110,7 +263,52 @@ def find_crosses(puzzle: PuzzleInput, letters: list[str]) -> int:
     return len(re.findall(pattern, conjoined, overlapped=True, flags=re.S))
 
 
+def count_crosses(grid: Grid) -> int:
+    corners = (
+        (1 << NORTH_EAST) | (1 << SOUTH_EAST) | (1 << SOUTH_WEST) | (1 << NORTH_WEST)
+    )
+    pairs = ((NORTH_EAST, SOUTH_WEST), (NORTH_WEST, SOUTH_EAST))
+    m_and_s = {ord("M"), ord("S")}
+    total = 0
+    for center in grid.find_all("A"):
+        if grid.masks[center] & corners != corners:
+            continue
+        for a, b in pairs:
+            ends = {grid[center + grid.offsets[a]], grid[center + grid.offsets[b]]}
+            if ends != m_and_s:
+                break
+        else:
+            total += 1
+    return total
+
+
+def count_crosses_numpy(letters: "np.ndarray") -> int:
+    """Every A with MAS on both diagonals, as one pass over the inner cells."""
+    m, s = ord("M"), ord("S")
+    north_west, north_east = letters[:-2, :-2], letters[:-2, 2:]
+    south_west, south_east = letters[2:, :-2], letters[2:, 2:]
+    crosses = (
+        (letters[1:-1, 1:-1] == ord("A"))
+        & (
+            ((north_west == m) & (south_east == s))
+            | ((north_west == s) & (south_east == m))
+        )
+        & (
+            ((north_east == m) & (south_west == s))
+            | ((north_east == s) & (south_west == m))
+        )
+    )
+    return int(np.count_nonzero(crosses))
+
+
 def part_2(puzzle: PuzzleInput) -> Any:
+    grid = parse(puzzle)
+    if np is not None:
+        return count_crosses_numpy(as_array(grid))
+    return count_crosses(grid)
+
+
+def part_2_regex(puzzle: PuzzleInput) -> Any:
     letter_sets = [
         ["M", "S", "M", "S"],
         ["M", "M", "S", "S"],
@@ -1,23 +1,30 @@
-import contextlib
-from typing import Any
+import functools
+from collections.abc import Mapping, Sequence
+from typing import Any, Self
 
-import networkx as nx
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.parse_cache import cached_parse
 
-def get_graph(puzzle: PuzzleInput) -> nx.DiGraph:
-    edges = []
+
+@cached_parse
+def get_rules(puzzle: PuzzleInput) -> Mapping[int, int]:
+    """
+    The precedence index: for every page, a bitmask with bit n set when page n
+    has to come after it.
+    """
+    rules: dict[int, int] = {}
     for line in puzzle.lines:
         if line.strip() == "":
             break
         left_str, right_str = line.split("|")
         left, right = int(left_str), int(right_str)
-        edges.append((left, right))
-
-    return nx.DiGraph(edges)
+        rules[left] = rules.get(left, 0) | 1 << right
+    return rules
 
 
-def get_pagesets(puzzle: PuzzleInput) -> list[list[int]]:
+@cached_parse
+def get_pagesets(puzzle: PuzzleInput) -> Sequence[Sequence[int]]:
     rules = []
     rules_raw = puzzle.raw.split("\n\n", 1)[1]
     for rule in rules_raw.strip().split("\n"):
@@ -29,44 +36,85 @@ def get_pagesets(puzzle: PuzzleInput) -> list[list[int]]:
     return rules
 
 
-def remove_other_nodes(graph: nx.DiGraph, retained_nodes: set[int]) -> nx.DiGraph:
-    local_graph = graph.copy()
-    other_nodes = set(local_graph.nodes.keys()) - retained_nodes
-    for other_node in other_nodes:
-        local_graph.remove_node(other_node)
-
-    return local_graph
-
-
-def get_correct_order(graph: nx.DiGraph, pages: list[int]) -> list[int]:
-    smallgraph = remove_other_nodes(graph, set(pages))
-    with contextlib.suppress(nx.NetworkXNoCycle):
-        nx.algorithms.find_cycle(smallgraph)
-        msg = "Cycle found, this might not work."
-        raise ValueError(msg)
-    path = list(nx.algorithms.topological_sort(smallgraph))
-    return path
-
-
-def get_valid_medians(graph: nx.DiGraph, page_sets: list[list[int]]) -> int:
+def is_ordered(rules: Mapping[int, int], pages: Sequence[int]) -> bool:
+    """Whether no page has one that must come after it somewhere before it."""
+    seen = 0
+    for page in pages:
+        if rules.get(page, 0) & seen:
+            return False
+        seen |= 1 << page
+    return True
+
+
+def compare_pages(rules: Mapping[int, int], left: int, right: int) -> int:
+    if rules.get(left, 0) >> right & 1:
+        return -1
+    if rules.get(right, 0) >> left & 1:
+        return 1
+    return 0
+
+
+def topological_order(rules: Mapping[int, int], pages: Sequence[int]) -> list[int]:
+    """
+    Order pages the rules don't fully order, taking one with nothing left
+    before it at a time.
+    """
+    remaining = 0
+    for page in pages:
+        remaining |= 1 << page
+    # Pages of the update that have to come before each page.
+    before = {
+        page: sum(1 << other for other in set(pages) if rules.get(other, 0) >> page & 1)
+        for page in pages
+    }
+    ordered = []
+    while remaining:
+        ready = [
+            page
+            for page in pages
+            if remaining >> page & 1 and not before[page] & remaining
+        ]
+        if not ready:
+            msg = "Cycle found, this might not work."
+            raise ValueError(msg)
+        ordered.append(ready[0])
+        remaining &= ~(1 << ready[0])
+    return ordered
+
+
+def get_correct_order(rules: Mapping[int, int], pages: Sequence[int]) -> list[int]:
+    ordered = sorted(
+        pages, key=functools.cmp_to_key(functools.partial(compare_pages, rules))
+    )
+    # Sorting relies on the rules ordering every pair of pages in the update,
+    # anything less needs the slower topological sort.
+    if not is_ordered(rules, ordered):
+        return topological_order(rules, pages)
+    return ordered
+
+
+def get_valid_medians(
+    rules: Mapping[int, int], page_sets: Sequence[Sequence[int]]
+) -> int:
     total = 0
     for pages in page_sets:
-        result = get_correct_order(graph, pages)
-        if result == pages:
-            total += result[len(result) // 2]
+        if is_ordered(rules, pages):
+            total += pages[len(pages) // 2]
     return total
 
 
 def part_1(puzzle: PuzzleInput) -> Any:
     pagesets = get_pagesets(puzzle)
-    graph = get_graph(puzzle)
-    return get_valid_medians(graph, pagesets)
+    rules = get_rules(puzzle)
+    return get_valid_medians(rules, pagesets)
 
 
-def get_all_medians(graph: nx.DiGraph, page_sets: list[list[int]]) -> int:
+def get_all_medians(
+    rules: Mapping[int, int], page_sets: Sequence[Sequence[int]]
+) -> int:
     total = 0
     for pages in page_sets:
-        result = get_correct_order(graph, pages)
+        result = get_correct_order(rules, pages)
         total += result[len(result) // 2]
     return total
 
@@ -74,8 +122,84 @@ def get_all_medians(graph: nx.DiGraph, page_sets: list[list[int]]) -> int:
 def part_2(puzzle: PuzzleInput) -> Any:
     pagesets = get_pagesets(puzzle)
     wrong_pagesets = []
-    graph = get_graph(puzzle)
+    rules = get_rules(puzzle)
     for pages in pagesets:
-        if get_correct_order(graph, pages) != pages:
+        if not is_ordered(rules, pages):
             wrong_pagesets.append(pages)
-    return get_all_medians(graph, wrong_pagesets)
+    return get_all_medians(rules, wrong_pagesets)
+
+
+class Backlog:
+    """
+    Updates kept validated against a rule set that changes a few rules at a
+    time. The order of an update only depends on the rules between its own
+    pages, so a changed rule only re-checks the updates with both its pages.
+    """
+
+    def __init__(
+        self, rules: Mapping[int, int], page_sets: Sequence[Sequence[int]]
+    ) -> None:
+        self.rules = dict(rules)
+        self.page_sets = [tuple(pages) for pages in page_sets]
+        self.containing: dict[int, set[int]] = {}
+        for index, pages in enumerate(self.page_sets):
+            for page in pages:
+                self.containing.setdefault(page, set()).add(index)
+        # Per update, whether it is valid and the median it adds to that total.
+        self.medians: list[tuple[bool, int]] = []
+        self.valid_total = self.corrected_total = 0
+        for pages in self.page_sets:
+            self.medians.append(self._median(pages))
+            self._count(self.medians[-1], 1)
+
+    @classmethod
+    def from_puzzle(cls, puzzle: PuzzleInput) -> Self:
+        return cls(get_rules(puzzle), get_pagesets(puzzle))
+
+    def _median(self, pages: Sequence[int]) -> tuple[bool, int]:
+        if is_ordered(self.rules, pages):
+            return True, pages[len(pages) // 2]
+        ordered = get_correct_order(self.rules, pages)
+        return False, ordered[len(ordered) // 2]
+
+    def _count(self, median: tuple[bool, int], sign: int) -> None:
+        valid, page = median
+        if valid:
+            self.valid_total += sign * page
+        else:
+            self.corrected_total += sign * page
+
+    def _change_rule(self, before: int, after: int, rule: int) -> None:
+        """
+        Swap in the new successors of a page after adding or removing the
+        given rule, and re-check the updates with both its pages. If any of
+        them can't be ordered any more nothing changes.
+        """
+        first = self.containing.get(before, set())
+        second = self.containing.get(after, set())
+        old_rule = self.rules.get(before)
+        self.rules[before] = rule
+        try:
+            changed = {
+                index: self._median(self.page_sets[index]) for index in first & second
+            }
+        except ValueError:
+            if old_rule is None:
+                del self.rules[before]
+            else:
+                self.rules[before] = old_rule
+            raise
+        for index, median in changed.items():
+            self._count(self.medians[index], -1)
+            self._count(median, 1)
+            self.medians[index] = median
+
+    def add_rule(self, before: int, after: int) -> None:
+        rule = self.rules.get(before, 0)
+        if not rule >> after & 1:
+            self._change_rule(before, after, rule | 1 << after)
+
+    def remove_rule(self, before: int, after: int) -> None:
+        rule = self.rules.get(before, 0)
+        if rule >> after & 1:
+            self._change_rule(before, after, rule & ~(1 << after))
@@ -1,142 +1,358 @@
-import enum
-from typing import Any
+import functools
+import os
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.util import Finalize
+from typing import Any, Self
 
-from aoc.datatypes import Coord, Direction
 from aoc.puzzle import PuzzleInput
-from tqdm import tqdm
-
-
-class Tile(enum.Enum):
-    WALL = "#"
-    FLOOR = "."
-
-
-def parse_maze(puzzle: PuzzleInput) -> tuple[dict[Coord, Tile], Coord]:
-    puzzzle_map = {}
-    guard = None
-    for row, line in enumerate(puzzle.lines):
-        for col, field in enumerate(line):
-            match field:
-                case "^":
-                    guard = Coord(row, col)
-                    puzzzle_map[Coord(row, col)] = Tile.FLOOR
-                case ".":
-                    puzzzle_map[Coord(row, col)] = Tile.FLOOR
-                case "#":
-                    puzzzle_map[Coord(row, col)] = Tile.WALL
-                case _:
-                    msg = "Unknown tile."
-                    raise ValueError(msg)
-
-    if guard is None:
-        msg = "No guard position found."
+
+from aoc_2024.grid import EAST, NORTH, SOUTH, WEST, Grid
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.progress import progress
+from aoc_2024.render import emit, overlay
+
+WALL = ord("#")
+DEFAULT_QUERY_CACHE = 4096
+# Labs with fewer cells than this are searched faster than a pool starts up.
+PARALLEL_THRESHOLD = 250_000
+
+
+@cached_parse
+def parse_maze(puzzle: PuzzleInput) -> tuple[Grid, int]:
+    grid = Grid.from_lines(puzzle.lines)
+    if set(grid.cells) - set(b"^.#"):
+        msg = "Unknown tile."
         raise ValueError(msg)
-    return puzzzle_map, guard
+
+    try:
+        guard = grid.find("^")
+    except ValueError:
+        msg = "No guard position found."
+        raise ValueError(msg) from None
+    return grid.replace(guard, "."), guard
 
 
-def simulate_walk(
-    puzzle: PuzzleInput, puzzle_map: dict[Coord, Tile], guard: tuple[Coord, Direction]
-) -> int:
-    overlapped = False
+def simulate_walk(grid: Grid, guard: tuple[int, int]) -> int:
     path = set()
-    path.add(guard)
-    while not overlapped:
-        overlapped, guard = take_step(puzzle, puzzle_map, guard, path)
-    unique_positions = {pos for pos, _ in path}
-    for row in range(len(puzzle.lines)):
-        for col in range(len(puzzle.lines[0])):
-            if Coord(row, col) in unique_positions:
-                print("X", end="")
-            else:
-                print(puzzle_map[Coord(row, col)].value, end="")
-        print()
+    path.add(guard[0] * 4 + guard[1])
+    while True:
+        done, (pos, direction) = take_step(grid, guard, path)
+        if done or pos is None:
+            break
+        guard = (pos, direction)
+    unique_positions = {state // 4 for state in path}
+    emit("Walked", lambda: overlay(grid, unique_positions, "X"))
     return len(unique_positions)
 
 
-def turn(current_direction: Direction) -> Direction:
-    match current_direction:
-        case Direction.NORTH:
-            return Direction.EAST
-        case Direction.EAST:
-            return Direction.SOUTH
-        case Direction.SOUTH:
-            return Direction.WEST
-        case Direction.WEST:
-            return Direction.NORTH
-
-
-def out_of_bounds(pos: Coord, puzzle: PuzzleInput) -> bool:
-    if pos.row < 0 or pos.col < 0:
-        return True
-    if pos.row >= len(puzzle.lines) or pos.col >= len(puzzle.lines[0]):
-        return True
-    return False
+def turn(current_direction: int) -> int:
+    return (current_direction + 1) % 4
 
 
 def take_step(
-    puzzle: PuzzleInput,
-    puzzle_map: dict[Coord, Tile],
-    guard: tuple[Coord, Direction],
-    path: set[tuple[Coord, Direction]],
-) -> tuple[bool, tuple[Coord, Direction]]:
-    new_guard_pos = guard[0] + guard[1]
-    if out_of_bounds(new_guard_pos, puzzle):
-        return True, (new_guard_pos, guard[1])
+    grid: Grid,
+    guard: tuple[int, int],
+    path: set[int],
+) -> tuple[bool, tuple[int | None, int]]:
+    """
+    Guard states are (cell index, direction index) and are stored in path as a
+    single int. A cell index of None means the guard walked off the map.
+    """
+    pos, direction = guard
+    new_guard_pos = grid.step(pos, direction)
+    if new_guard_pos is None:
+        return True, (None, direction)
 
     # Check if we need to turn
-    if puzzle_map[new_guard_pos] == Tile.WALL:
-        new_guard_pos = guard[0]
-        guard_direction = turn(guard[1])
-    else:
-        guard_direction = guard[1]
+    if grid[new_guard_pos] == WALL:
+        new_guard_pos = pos
+        direction = turn(direction)
 
-    if (new_guard_pos, guard_direction) in path:
-        return True, (new_guard_pos, guard_direction)
+    state = new_guard_pos * 4 + direction
+    if state in path:
+        return True, (new_guard_pos, direction)
 
-    path.add((new_guard_pos, guard_direction))
-    return False, (new_guard_pos, guard_direction)
+    path.add(state)
+    return False, (new_guard_pos, direction)
 
 
 def part_1(puzzle: PuzzleInput) -> Any:
-    puzzle_map, guard = parse_maze(puzzle)
-    starting_direction = Direction.NORTH
-    return simulate_walk(puzzle, puzzle_map, (guard, starting_direction))
+    grid, guard = parse_maze(puzzle)
+    return simulate_walk(grid, (guard, NORTH))
 
 
-def find_loop(
-    puzzle: PuzzleInput, puzzle_map: dict[Coord, Tile], guard: tuple[Coord, Direction]
-) -> tuple[bool, set[Coord]]:
-    done = False
+def find_loop(grid: Grid, guard: tuple[int, int]) -> tuple[bool, set[int]]:
     path = set()
-    path.add(guard)
-    while not done:
-        done, guard = take_step(puzzle, puzzle_map, guard, path)
-    unique_positions = {pos for pos, _ in path}
-    if out_of_bounds(guard[0], puzzle):
-        return False, unique_positions
-    return True, unique_positions
+    path.add(guard[0] * 4 + guard[1])
+    while True:
+        done, (pos, direction) = take_step(grid, guard, path)
+        if pos is None:
+            return False, {state // 4 for state in path}
+        if done:
+            return True, {state // 4 for state in path}
+        guard = (pos, direction)
+
+
+class JumpTable:
+    """
+    For every cell and direction, where a guard walking that way stops: the
+    cell just before the next wall, or -1 when it walks off the map. The guard
+    then goes from turn to turn instead of cell by cell.
+
+    A single added obstacle only changes the stops on its own row and column,
+    so rather than rebuilding the table walks check whether it is in the way
+    of each jump.
+    """
+
+    __slots__ = ("grid", "stops")
+
+    def __init__(
+        self, grid: Grid, stops: Sequence[Sequence[int]] | None = None
+    ) -> None:
+        self.grid = grid
+        if stops is not None:
+            self.stops = stops
+            return
+        rows, cols, cells = grid.rows, grid.cols, grid.cells
+        table = [[-1] * len(cells) for _ in range(4)]
+        # Scan every line against the walking direction, carrying the stop.
+        lines = {
+            NORTH: [range(col, len(cells), cols) for col in range(cols)],
+            EAST: [
+                range((row + 1) * cols - 1, row * cols - 1, -1) for row in range(rows)
+            ],
+            SOUTH: [range(len(cells) - cols + col, -1, -cols) for col in range(cols)],
+            WEST: [range(row * cols, (row + 1) * cols) for row in range(rows)],
+        }
+        for direction, scans in lines.items():
+            direction_stops = table[direction]
+            back = -grid.offsets[direction]
+            for scan in scans:
+                stop = -1
+                for index in scan:
+                    if cells[index] == WALL:
+                        stop = index + back
+                    else:
+                        direction_stops[index] = stop
+        self.stops = table
+
+    def blocks(self, obstacle: int, pos: int, direction: int, stop: int) -> bool:
+        """Whether an obstacle is between pos and where the guard would stop."""
+        cols = self.grid.cols
+        if direction in (NORTH, SOUTH):
+            if obstacle % cols != pos % cols:
+                return False
+        elif obstacle // cols != pos // cols:
+            return False
+        if direction in (NORTH, WEST):
+            return obstacle < pos and (stop == -1 or obstacle >= stop)
+        return obstacle > pos and (stop == -1 or obstacle <= stop)
+
+    def jump(self, pos: int, direction: int, obstacle: int | None = None) -> int:
+        stop = self.stops[direction][pos]
+        if obstacle is not None and self.blocks(obstacle, pos, direction, stop):
+            stop = obstacle - self.grid.offsets[direction]
+        return stop
+
+    def loops(self, guard: tuple[int, int], obstacle: int | None = None) -> bool:
+        """Whether the guard walks in a loop, with an extra wall at obstacle."""
+        pos, direction = guard
+        turns = set()
+        while True:
+            pos = self.jump(pos, direction, obstacle)
+            if pos == -1:
+                return False
+            state = pos * 4 + direction
+            if state in turns:
+                return True
+            turns.add(state)
+            direction = turn(direction)
+
+
+def first_entries(grid: Grid, guard: tuple[int, int]) -> list[tuple[int, int, int]]:
+    """
+    Every cell the guard walks into other than its start, as (cell, position,
+    direction) with the guard state just before it first steps into the cell.
+    An obstacle there leaves the route up to that state unchanged.
+    """
+    pos, direction = guard
+    seen = {pos}
+    turns = set()
+    entries = []
+    while (ahead := grid.step(pos, direction)) is not None:
+        if grid[ahead] == WALL:
+            # Without an obstacle the guard may already be walking in a loop.
+            if pos * 4 + direction in turns:
+                break
+            turns.add(pos * 4 + direction)
+            direction = turn(direction)
+            continue
+        if ahead not in seen:
+            seen.add(ahead)
+            entries.append((ahead, pos, direction))
+        pos = ahead
+    return entries
+
+
+def count_loops(table: JumpTable, entries: Iterable[tuple[int, int, int]]) -> int:
+    total = 0
+    for obstacle, pos, direction in entries:
+        total += table.loops((pos, direction), obstacle)
+    return total
+
+
+# The table a pool worker reads from shared memory and the views it reads it
+# through, set by attach_table.
+_shared: tuple[SharedMemory, JumpTable, list[memoryview]] | None = None
+
+
+def shared_buffer(memory: SharedMemory) -> memoryview:
+    if memory.buf is None:
+        msg = f"Shared memory {memory.name} is closed."
+        raise RuntimeError(msg)
+    return memory.buf
+
+
+def share_table(table: JumpTable) -> SharedMemory:
+    """Copy the stops and the map into one block of shared memory."""
+    cells = len(table.grid)
+    memory = SharedMemory(create=True, size=17 * cells)
+    buffer = shared_buffer(memory)
+    with buffer[: 16 * cells] as raw, raw.cast("i") as stops:
+        for direction in range(4):
+            stops[direction * cells : (direction + 1) * cells] = array(
+                "i", table.stops[direction]
+            )
+    buffer[16 * cells :] = table.grid.cells
+    return memory
+
+
+def attach_table(name: str, rows: int, cols: int) -> None:
+    global _shared
+    # The parent owns the block, workers mustn't unlink it when they exit.
+    memory = SharedMemory(name=name, track=False)
+    cells = rows * cols
+    buffer = shared_buffer(memory)
+    grid = Grid(rows, cols, bytes(buffer[16 * cells :]))
+    raw = buffer[: 16 * cells]
+    stops = raw.cast("i")
+    directions = [stops[d * cells : (d + 1) * cells] for d in range(4)]
+    _shared = memory, JumpTable(grid, directions), [raw, stops, *directions]
+    # The mapping can't be closed while views of it are alive, let go of both
+    # when the worker exits.
+    Finalize(None, detach_table, exitpriority=0)
+
+
+def detach_table() -> None:
+    global _shared
+    if _shared is None:
+        return
+    memory, _, views = _shared
+    _shared = None
+    for view in reversed(views):
+        view.release()
+    memory.close()
+
+
+def count_shared_loops(entries: Sequence[tuple[int, int, int]]) -> int:
+    if _shared is None:
+        msg = "Worker has no shared jump table."
+        raise RuntimeError(msg)
+    return count_loops(_shared[1], entries)
+
+
+def count_loops_parallel(
+    table: JumpTable,
+    entries: Sequence[tuple[int, int, int]],
+    workers: int | None = None,
+) -> int:
+    """
+    Split the candidates across a process pool. The table goes into shared
+    memory once and each worker maps it, only the candidates are sent over.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Candidates close together on the route tend to loop for about as long,
+    # so the route is cut into more chunks than workers to spread slow stretches.
+    size = max(len(entries) // (workers * 4), 1)
+    chunks = [entries[i : i + size] for i in range(0, len(entries), size)]
+    grid = table.grid
+    memory = share_table(table)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=attach_table,
+            initargs=(memory.name, grid.rows, grid.cols),
+        ) as pool:
+            results = pool.map(count_shared_loops, chunks)
+            return sum(progress(results, "obstacles", total=len(chunks)))
+    finally:
+        memory.close()
+        memory.unlink()
 
 
 def find_obsticle_pos(
-    puzzle: PuzzleInput, puzzle_map: dict[Coord, Tile], guard: tuple[Coord, Direction]
+    grid: Grid, guard: tuple[int, int], workers: int | None = None
 ) -> int:
-    _, possible_positions = find_loop(puzzle, puzzle_map, guard)
-    possible_positions.remove(guard[0])  # Remove guard starting position
-    total = 0
-    for current in tqdm(possible_positions):
-        if puzzle_map[current] == Tile.WALL:
-            msg = "Somehow we had a wall in our path"
+    """
+    Count the cells where a new obstacle puts the guard in a loop. Only cells
+    on the route can change it, and each is tried from where the guard first
+    reaches it. Big labs are searched across a pool of workers, or whenever
+    workers is given.
+    """
+    entries = first_entries(grid, guard)
+    table = JumpTable(grid)
+    if workers is not None or len(grid) >= PARALLEL_THRESHOLD:
+        return count_loops_parallel(table, entries, workers)
+    return count_loops(table, progress(entries, "obstacles"))
+
+
+class ObstacleQueries:
+    """
+    Answers whether an extra wall puts the guard in a loop, for one lab. The
+    base patrol and the jump table are worked out once. A wall off the route
+    changes nothing, and one on it is walked from the guard's state just
+    before it, turn to turn, so a query costs the turns it takes rather than
+    the cells. The most recent answers are kept in an LRU cache.
+    """
+
+    def __init__(
+        self, grid: Grid, guard: int, cache_size: int = DEFAULT_QUERY_CACHE
+    ) -> None:
+        self.grid = grid
+        self.guard = (guard, NORTH)
+        self.table = JumpTable(grid)
+        self.entries = {
+            cell: (pos, direction)
+            for cell, pos, direction in first_entries(grid, self.guard)
+        }
+        self.base_loops = self.table.loops(self.guard)
+        self.query = functools.lru_cache(maxsize=cache_size)(self._query)
+
+    @classmethod
+    def from_puzzle(
+        cls, puzzle: PuzzleInput, cache_size: int = DEFAULT_QUERY_CACHE
+    ) -> Self:
+        return cls(*parse_maze(puzzle), cache_size=cache_size)
+
+    def _query(self, obstacle: int) -> bool:
+        if not 0 <= obstacle < len(self.grid):
+            msg = f"Cell {obstacle} is not on the map."
             raise ValueError(msg)
+        if obstacle == self.guard[0]:
+            msg = "Can't put an obstacle where the guard is standing."
+            raise ValueError(msg)
+        if obstacle not in self.entries:
+            return self.base_loops
+        return self.table.loops(self.entries[obstacle], obstacle)
 
-        temp_puzzle_map = puzzle_map.copy()
-        temp_puzzle_map[current] = Tile.WALL
-        loop, _ = find_loop(puzzle, temp_puzzle_map, guard)
-        if loop:
-            total += 1
-    return total
+    def query_many(self, obstacles: Iterable[int]) -> Mapping[int, bool]:
+        """Answer a batch of queries, each distinct cell once."""
+        return {obstacle: self.query(obstacle) for obstacle in dict.fromkeys(obstacles)}
 
 
 def part_2(puzzle: PuzzleInput) -> Any:
-    puzzle_map, guard = parse_maze(puzzle)
-    starting_direction = Direction.NORTH
-    return find_obsticle_pos(puzzle, puzzle_map, (guard, starting_direction))
+    grid, guard = parse_maze(puzzle)
+    return find_obsticle_pos(grid, (guard, NORTH))
@@ -1,60 +1,352 @@
-from typing import Any
+import functools
+import itertools
+import os
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Protocol
 
-from aoc.puzzle import PuzzleInput
-from tqdm import tqdm
+from aoc_2024.parse_cache import cached_parse
+from aoc_2024.progress import progress
+from aoc_2024.streaming import AnyInput, iter_lines
 
+POWERS_OF_TEN: tuple[int, ...] = tuple(10**i for i in range(1, 20))
+# Equations are sent to pool workers this many at a time, and files with no
+# more than this are solved right away.
+CHUNK_SIZE = 5000
+# Chunks waiting on or being solved by each worker. More would read ahead of
+# the pool, which for a streamed file means holding it all in memory.
+CHUNKS_IN_FLIGHT = 2
 
-def parse_input(puzzle: PuzzleInput) -> list[tuple[int, list[int]]]:
-    equations = []
-    for line in puzzle.lines:
+
+@cached_parse
+def parse_input(puzzle: AnyInput) -> Iterator[tuple[int, Sequence[int]]]:
+    for line in iter_lines(puzzle):
         target_str, rest = line.split(": ", 1)
         target = int(target_str)
         nums = [int(x) for x in rest.split()]
-        equations.append((target, nums))
-    return equations
+        yield target, nums
 
 
-def unjoin(a: int, b: int) -> int:
-    if not str(a).endswith(str(b)):
-        msg = f"The digits of {b} must occur in that order at the end of {a}"
-        raise ValueError(msg)
-    return a // 10 ** (len(str(b)))
+def power_above(num: int) -> int:
+    """The power of ten a number is multiplied by to join num onto it."""
+    index = bisect_right(POWERS_OF_TEN, num)
+    if index < len(POWERS_OF_TEN):
+        return POWERS_OF_TEN[index]
+    power: int = 10 ** len(str(num))
+    return power
 
 
-def solve_recursive(target: int, nums: list[int], joins: bool = False) -> bool:
-    if target < 0:
+def solve(target: int, nums: Sequence[int], joins: bool = False) -> bool:
+    """
+    Whether the operands can make the target with additions, multiplications
+    and optionally joins. Operands are walked back from the last by index on an
+    explicit stack, and joins are undone with a division by the power of ten
+    above the operand. Every prefix of the operands has bounds on what it can
+    make, targets outside them are dropped before going any deeper. Operands
+    are expected to be non-negative.
+    """
+    count = len(nums)
+    if count == 0:
         return False
+    shifts = [power_above(num) for num in nums] if joins else []
+    low, high = [nums[0]] * count, [nums[0]] * count
+    for i in range(1, count):
+        num = nums[i]
+        low[i] = min(low[i - 1] + num, low[i - 1] * num)
+        high[i] = max(high[i - 1] + num, high[i - 1] * num)
+        if joins:
+            high[i] = max(high[i], high[i - 1] * shifts[i] + num)
 
-    if len(nums) == 1:
-        if nums[0] == target:
+    stack = [(target, count - 1)]
+    while stack:
+        target, i = stack.pop()
+        if not low[i] <= target <= high[i]:
+            continue
+        if i == 0:
             return True
-        return False
+        num = nums[i]
+        if num == 0:
+            # Anything times zero is zero.
+            if target == 0:
+                return True
+        elif target % num == 0:
+            stack.append((target // num, i - 1))
+        if joins and target % shifts[i] == num:
+            stack.append((target // shifts[i], i - 1))
+        stack.append((target - num, i - 1))
+    return False
+
+
+class Operator(Protocol):
+    """
+    An operator that can go between two operands. Solvers work back from the
+    target, so an operator also says whether a target can come from it with a
+    given right operand, and what the left operand was then. The inverse is
+    None when any left operand would do.
+    """
+
+    symbol: str
+
+    def apply(self, left: int, right: int) -> int: ...
+
+    def feasible(self, target: int, right: int) -> bool: ...
+
+    def inverse(self, target: int, right: int) -> int | None: ...
+
+    def bounds(self, low: int, high: int, right: int) -> tuple[int, int]:
+        """
+        The range the operator can make from left operands between low and
+        high. This holds for operators that are monotonic in the left operand,
+        others have to override it.
+        """
+        first, last = self.apply(low, right), self.apply(high, right)
+        return min(first, last), max(first, last)
+
+
+@dataclass(frozen=True)
+class Add(Operator):
+    symbol: str = "+"
+
+    def apply(self, left: int, right: int) -> int:
+        return left + right
+
+    def feasible(self, target: int, right: int) -> bool:
+        return True
+
+    def inverse(self, target: int, right: int) -> int | None:
+        return target - right
+
+
+@dataclass(frozen=True)
+class Multiply(Operator):
+    symbol: str = "*"
+
+    def apply(self, left: int, right: int) -> int:
+        return left * right
+
+    def feasible(self, target: int, right: int) -> bool:
+        if right == 0:
+            return target == 0
+        return target % right == 0
+
+    def inverse(self, target: int, right: int) -> int | None:
+        # Anything times zero is zero.
+        if right == 0:
+            return None
+        return target // right
+
+
+@dataclass(frozen=True)
+class Subtract(Operator):
+    symbol: str = "-"
+
+    def apply(self, left: int, right: int) -> int:
+        return left - right
+
+    def feasible(self, target: int, right: int) -> bool:
+        return True
+
+    def inverse(self, target: int, right: int) -> int | None:
+        return target + right
+
+
+@dataclass(frozen=True)
+class Xor(Operator):
+    symbol: str = "^"
+
+    def apply(self, left: int, right: int) -> int:
+        return left ^ right
+
+    def feasible(self, target: int, right: int) -> bool:
+        return True
 
-    possible_targets = [target - nums[-1]]
+    def inverse(self, target: int, right: int) -> int | None:
+        return target ^ right
 
-    if joins is True and str(target).endswith(str(nums[-1])):
-        possible_targets.append(unjoin(target, nums[-1]))
+    def bounds(self, low: int, high: int, right: int) -> tuple[int, int]:
+        bits = max(abs(low), abs(high), abs(right)).bit_length()
+        return -(1 << bits), (1 << bits) - 1
 
-    if target % nums[-1] == 0:
-        possible_targets.append(target // nums[-1])
 
-    return any(solve_recursive(t, nums[:-1], joins=joins) for t in possible_targets)
+@dataclass(frozen=True)
+class Concat(Operator):
+    """Joins the digits of the right operand onto the left one in a base."""
 
+    base: int = 10
+    symbol: str = "||"
 
-def count_possible(equations: list[tuple[int, list[int]]], joins: bool = False) -> int:
+    def __post_init__(self) -> None:
+        # Powers of a smaller base never grow past the right operand.
+        if self.base < 2:
+            msg = f"Can't join digits in base {self.base}."
+            raise ValueError(msg)
+
+    def shift(self, right: int) -> int:
+        if self.base == 10:
+            return power_above(right)
+        power = self.base
+        while power <= right:
+            power *= self.base
+        return power
+
+    def apply(self, left: int, right: int) -> int:
+        return left * self.shift(right) + right
+
+    def feasible(self, target: int, right: int) -> bool:
+        return (target - right) % self.shift(right) == 0
+
+    def inverse(self, target: int, right: int) -> int | None:
+        return (target - right) // self.shift(right)
+
+
+STANDARD = (Add(), Multiply())
+WITH_JOINS = (Add(), Multiply(), Concat())
+
+
+class Solver:
+    """
+    The reverse search of solve for any operator set. The operators' bounds
+    prune targets no prefix of the operands can make, and their feasibility
+    checks and inverses pick the branches, so a new operator doesn't mean
+    trying every combination.
+    """
+
+    def __init__(self, operators: Sequence[Operator]) -> None:
+        if not operators:
+            msg = "A solver needs at least one operator."
+            raise ValueError(msg)
+        self.operators = tuple(operators)
+        self._bounds = tuple(operator.bounds for operator in self.operators)
+        self._undo = tuple(
+            (operator.feasible, operator.inverse) for operator in self.operators
+        )
+
+    def __call__(self, target: int, nums: Sequence[int]) -> bool:
+        count = len(nums)
+        if count == 0:
+            return False
+        low, high = [nums[0]] * count, [nums[0]] * count
+        for i in range(1, count):
+            ranges = [
+                bounds(low[i - 1], high[i - 1], nums[i]) for bounds in self._bounds
+            ]
+            low[i] = min(first for first, _ in ranges)
+            high[i] = max(last for _, last in ranges)
+
+        stack = [(target, count - 1)]
+        while stack:
+            target, i = stack.pop()
+            if not low[i] <= target <= high[i]:
+                continue
+            if i == 0:
+                return True
+            num = nums[i]
+            for feasible, inverse in self._undo:
+                if feasible(target, num):
+                    left = inverse(target, num)
+                    if left is None:
+                        return True
+                    stack.append((left, i - 1))
+        return False
+
+
+def make_solver(
+    operators: Sequence[Operator],
+) -> Callable[[int, Sequence[int]], bool]:
+    """
+    A solver for an operator set. The puzzle's own sets, STANDARD and
+    WITH_JOINS, get the hand written solve, any other set is run by Solver.
+    """
+    operators = tuple(operators)
+    if operators in (STANDARD, WITH_JOINS):
+        return functools.partial(solve, joins=operators == WITH_JOINS)
+    return Solver(operators)
+
+
+def count_chunk(
+    equations: Sequence[tuple[int, Sequence[int]]],
+    solver: Callable[[int, Sequence[int]], bool],
+) -> int:
     total = 0
-    for target, nums in tqdm(equations):
-        if solve_recursive(target, nums, joins=joins) is True:
+    for target, nums in equations:
+        if solver(target, nums):
             total += target
-
     return total
 
 
-def part_1(puzzle: PuzzleInput) -> Any:
+# The solver of a pool worker, set once by set_solver.
+_solver: Callable[[int, Sequence[int]], bool] | None = None
+
+
+def set_solver(solver: Callable[[int, Sequence[int]], bool]) -> None:
+    global _solver
+    _solver = solver
+
+
+def count_worker_chunk(equations: Sequence[tuple[int, Sequence[int]]]) -> int:
+    if _solver is None:
+        msg = "Worker has no solver."
+        raise RuntimeError(msg)
+    return count_chunk(equations, _solver)
+
+
+def count_pooled(
+    chunks: Iterator[Sequence[tuple[int, Sequence[int]]]],
+    solver: Callable[[int, Sequence[int]], bool],
+    workers: int,
+) -> Iterator[int]:
+    """
+    The totals of chunks solved across a process pool, as they finish. Only a
+    few chunks per worker are read ahead, a new one goes out as one finishes.
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=set_solver, initargs=(solver,)
+    ) as pool:
+        pending: set[Future[int]] = {
+            pool.submit(count_worker_chunk, chunk)
+            for chunk in itertools.islice(chunks, CHUNKS_IN_FLIGHT * workers)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for chunk in itertools.islice(chunks, 1):
+                    pending.add(pool.submit(count_worker_chunk, chunk))
+                yield future.result()
+
+
+def count_possible(
+    equations: Iterable[tuple[int, Sequence[int]]],
+    joins: bool = False,
+    workers: int | None = None,
+    operators: Sequence[Operator] | None = None,
+) -> int:
+    """
+    The sum of the targets that can be made, with the given operators or else
+    the puzzle's. More than a chunk of equations, or giving workers, solves
+    them in chunks across a process pool.
+    """
+    if operators is None:
+        operators = WITH_JOINS if joins else STANDARD
+    solver = make_solver(operators)
+    chunks = itertools.batched(equations, CHUNK_SIZE)
+    first = next(chunks, ())
+    second = next(chunks, None)
+    if workers is None and second is None:
+        return count_chunk(first, solver)
+
+    workers = workers or os.cpu_count() or 1
+    read = [first] if second is None else [first, second]
+    results = count_pooled(itertools.chain(read, chunks), solver, workers)
+    return sum(progress(results, "equation chunks"))
+
+
+def part_1(puzzle: AnyInput) -> Any:
     equations = parse_input(puzzle)
     return count_possible(equations, joins=False)
 
 
-def part_2(puzzle: PuzzleInput) -> Any:
+def part_2(puzzle: AnyInput) -> Any:
     equations = parse_input(puzzle)
     return count_possible(equations, joins=True)
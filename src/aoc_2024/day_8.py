@@ -1,58 +1,83 @@
+import math
 from collections import defaultdict
+from collections.abc import Mapping
+from collections.abc import Set as AbstractSet
 from typing import Any
 
 from aoc.datatypes import Coord, itertools
 from aoc.puzzle import PuzzleInput
 
+from aoc_2024.grid import Grid
+from aoc_2024.parse_cache import cached_parse
 
-def parse_puzzle(puzzle: PuzzleInput) -> dict[str, set[Coord]]:
-    grid = defaultdict(set)
-    for row, line in enumerate(puzzle.lines):
-        for col, char in enumerate(line):
-            if char != ".":
-                grid[char].add(Coord(row, col))
-    return grid
+EMPTY = ord(".")
 
 
-def get_size(puzzle: PuzzleInput) -> Coord:
-    return Coord(row=len(puzzle.lines), col=len(puzzle.lines[0]))
+@cached_parse
+def parse_puzzle(puzzle: PuzzleInput) -> tuple[Grid, Mapping[str, AbstractSet[Coord]]]:
+    grid = Grid.from_lines(puzzle.lines)
+    antennas = defaultdict(set)
+    for index, char in enumerate(grid.cells):
+        if char != EMPTY:
+            antennas[chr(char)].add(grid.coord(index))
+    return grid, antennas
+
+
+def line_span(position: int, delta: int, size: int) -> tuple[int, int]:
+    """The multiples k of delta that keep position + k * delta in [0, size)."""
+    if delta > 0:
+        return -(position // delta), (size - 1 - position) // delta
+    return -((size - 1 - position) // -delta), position // -delta
+
+
+def mark_line(grid: Grid, bitmap: bytearray, point: Coord, step: Coord) -> None:
+    """Mark every cell on the map in line with point, stepping by step."""
+    low, high = -len(bitmap), len(bitmap)
+    for position, delta, size in (
+        (point.row, step.row, grid.rows),
+        (point.col, step.col, grid.cols),
+    ):
+        if delta:
+            first, last = line_span(position, delta, size)
+            low, high = max(low, first), min(high, last)
+    stride = step.row * grid.cols + step.col
+    # Step down the map, so the cells are in order in the bitmap.
+    if stride < 0:
+        stride, low, high = -stride, -high, -low
+    start = grid.index(point) + low * stride
+    count = high - low + 1
+    bitmap[start : start + (count - 1) * stride + 1 : stride] = b"\x01" * count
 
 
 def get_antinodes(
-    grid: dict[str, set[Coord]], size: Coord, part_2: bool = False
+    grid: Grid, antennas: Mapping[str, AbstractSet[Coord]], part_2: bool = False
 ) -> int:
-    all_antinodes: set[Coord] = set()
-    for char in grid.keys():
-        for first, second in itertools.combinations(grid[char], 2):
+    """
+    Antinodes are marked in a bitmap with a byte per cell. For part 2 every
+    pair marks its whole line, stepping by the difference divided by its gcd
+    and clipped to the map up front, so nothing off the map is ever made.
+    """
+    bitmap = bytearray(len(grid))
+    for char in antennas.keys():
+        for first, second in itertools.combinations(antennas[char], 2):
             diff = first - second
             if part_2 is True:
-                for i in range(size.row):
-                    all_antinodes.add(first + (diff * i))
-                    all_antinodes.add(second - (diff * i))
+                divisor = math.gcd(diff.row, diff.col)
+                mark_line(
+                    grid, bitmap, first, Coord(diff.row // divisor, diff.col // divisor)
+                )
             else:
-                all_antinodes.add(first + diff)
-                all_antinodes.add(second - diff)
-
-    in_bound_antinodes = []
-    for node in all_antinodes:
-        if (
-            node.row >= 0
-            and node.row < size.row
-            and node.col >= 0
-            and node.col < size.col
-        ):
-            in_bound_antinodes.append(node)
-
-    return len(set(in_bound_antinodes))
+                for node in (first + diff, second - diff):
+                    if grid.in_bounds(node):
+                        bitmap[grid.index(node)] = 1
+    return bitmap.count(1)
 
 
 def part_1(puzzle: PuzzleInput) -> Any:
-    grid = parse_puzzle(puzzle)
-    size = get_size(puzzle)
-    return get_antinodes(grid, size)
+    grid, antennas = parse_puzzle(puzzle)
+    return get_antinodes(grid, antennas)
 
 
 def part_2(puzzle: PuzzleInput) -> Any:
-    grid = parse_puzzle(puzzle)
-    size = get_size(puzzle)
-    return get_antinodes(grid, size, part_2=True)
+    grid, antennas = parse_puzzle(puzzle)
+    return get_antinodes(grid, antennas, part_2=True)
@@ -0,0 +1,210 @@
+"""
+Sorting int64 values that don't fit in memory. Values are cut into sorted runs
+saved as raw int64 files, which are memory mapped and merged back block by
+block. Everything here works on sorted streams of numpy blocks, so memory is
+bounded by the block sizes rather than the number of values.
+"""
+
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+type Int64Array = npt.NDArray[np.int64]
+
+MEMORY_BUDGET_ENV = "AOC_MEMORY_BUDGET"
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+MIN_BLOCK = 1024
+# A merge holds up to two blocks per run while one is read behind the other,
+# the merged output and the sort's buffer, at 8 bytes a value.
+BYTES_PER_BLOCK = 32
+
+
+def memory_budget() -> int:
+    """
+    Bytes the out-of-core solutions may use, from AOC_MEMORY_BUDGET. Runs and
+    blocks never go below MIN_BLOCK values, so budgets under a few hundred KiB
+    can be overrun.
+    """
+    return int(os.environ.get(MEMORY_BUDGET_ENV, DEFAULT_MEMORY_BUDGET))
+
+
+class RunWriter:
+    """
+    Collects values into one preallocated run of run_size, which is sorted in
+    place and spilled to disk each time it fills up.
+    """
+
+    def __init__(self, directory: Path, name: str, run_size: int) -> None:
+        self.directory = directory
+        self.name = name
+        self.run_size = max(run_size, MIN_BLOCK)
+        self.runs: list[Path] = []
+        self._run: Int64Array | None = None
+        self._filled = 0
+
+    def add(self, values: Int64Array) -> None:
+        if self._run is None:
+            self._run = np.empty(self.run_size, dtype=np.int64)
+        while len(values):
+            take = min(len(values), self.run_size - self._filled)
+            self._run[self._filled : self._filled + take] = values[:take]
+            self._filled += take
+            values = values[take:]
+            if self._filled == self.run_size:
+                self._spill()
+
+    def _spill(self) -> None:
+        if self._run is None:
+            return
+        run = self._run[: self._filled]
+        run.sort()
+        path = self.directory / f"{self.name}.{len(self.runs)}.int64"
+        run.tofile(path)
+        self.runs.append(path)
+        self._filled = 0
+
+    def finish(self) -> list[Path]:
+        if self._filled:
+            self._spill()
+        self._run = None
+        return self.runs
+
+
+def read_run(path: Path, block: int) -> Iterator[Int64Array]:
+    if path.stat().st_size == 0:
+        return
+    run = np.memmap(path, dtype=np.int64, mode="r")
+    for start in range(0, len(run), block):
+        yield np.array(run[start : start + block])
+
+
+def fan_in(budget: int) -> int:
+    """How many runs can be merged at once with at least MIN_BLOCK per run."""
+    return max(budget // (BYTES_PER_BLOCK * MIN_BLOCK) - 1, 2)
+
+
+def merge_runs(runs: list[Path], budget: int) -> Iterator[Int64Array]:
+    """
+    Merge sorted runs into one sorted stream of blocks. Each step takes what
+    every run has buffered up to the smallest buffered maximum, which is safe
+    to emit because no run can still produce anything below it. When there are
+    too many runs to fit a block of each in the budget they are first merged
+    into fewer, longer runs on disk.
+    """
+    limit = fan_in(budget)
+    generation = 0
+    while len(runs) > limit:
+        merged_runs = []
+        for i in range(0, len(runs), limit):
+            group = runs[i : i + limit]
+            path = group[0].with_suffix(f".merged{generation}.{i}")
+            with path.open("wb") as f:
+                for values in merge_runs(group, budget):
+                    values.tofile(f)
+            for run in group:
+                run.unlink()
+            merged_runs.append(path)
+        runs = merged_runs
+        generation += 1
+
+    block = max(budget // (BYTES_PER_BLOCK * (len(runs) + 1)), MIN_BLOCK)
+    readers = [read_run(path, block) for path in runs]
+    heads: dict[int, Int64Array] = {}
+    for i, reader in enumerate(readers):
+        head = next(reader, None)
+        if head is not None:
+            heads[i] = head
+
+    while heads:
+        bound = min(head[-1] for head in heads.values())
+        taken = []
+        for i, head in list(heads.items()):
+            cut = int(np.searchsorted(head, bound, side="right"))
+            taken.append(head[:cut])
+            rest: Int64Array | None = head[cut:]
+            if rest is not None and not len(rest):
+                rest = next(readers[i], None)
+            if rest is None:
+                del heads[i]
+            else:
+                heads[i] = rest
+        merged = np.concatenate(taken)
+        merged.sort(kind="stable")
+        yield merged
+
+
+def zip_blocks(
+    first: Iterable[Int64Array], second: Iterable[Int64Array]
+) -> Iterator[tuple[Int64Array, Int64Array]]:
+    """Pair up two streams of the same length as blocks of equal size."""
+    first, second = iter(first), iter(second)
+    a: Int64Array | None = np.empty(0, dtype=np.int64)
+    b: Int64Array | None = np.empty(0, dtype=np.int64)
+    while True:
+        if a is not None and not len(a):
+            a = next(first, None)
+        if b is not None and not len(b):
+            b = next(second, None)
+        if a is None or b is None:
+            if a is not None or b is not None:
+                msg = "Streams have different lengths."
+                raise ValueError(msg)
+            return
+        size = min(len(a), len(b))
+        yield a[:size], b[:size]
+        a, b = a[size:], b[size:]
+
+
+def counted(blocks: Iterable[Int64Array]) -> Iterator[tuple[Int64Array, Int64Array]]:
+    """
+    Run length encode a sorted stream into blocks of distinct values and their
+    counts. The last value of a block is held back in case it continues.
+    """
+    carry: tuple[Int64Array, Int64Array] | None = None
+    for block in blocks:
+        if not len(block):
+            continue
+        values, counts = np.unique(block, return_counts=True)
+        counts = counts.astype(np.int64, copy=False)
+        if carry is not None:
+            if values[0] == carry[0][0]:
+                counts[0] += carry[1][0]
+            else:
+                values = np.concatenate((carry[0], values))
+                counts = np.concatenate((carry[1], counts))
+        carry = values[-1:], counts[-1:]
+        if len(values) > 1:
+            yield values[:-1], counts[:-1]
+    if carry is not None:
+        yield carry
+
+
+def join_counts(
+    first: Iterable[tuple[Int64Array, Int64Array]],
+    second: Iterable[tuple[Int64Array, Int64Array]],
+) -> Iterator[tuple[Int64Array, Int64Array, Int64Array]]:
+    """
+    Inner join two counted streams on value, yielding the shared values with
+    their count in each stream.
+    """
+    first, second = iter(first), iter(second)
+    a = next(first, None)
+    b = next(second, None)
+    while a is not None and b is not None:
+        bound = min(a[0][-1], b[0][-1])
+        a_cut = int(np.searchsorted(a[0], bound, side="right"))
+        b_cut = int(np.searchsorted(b[0], bound, side="right"))
+        values, a_index, b_index = np.intersect1d(
+            a[0][:a_cut], b[0][:b_cut], assume_unique=True, return_indices=True
+        )
+        yield values, a[1][:a_cut][a_index], b[1][:b_cut][b_index]
+
+        a = (a[0][a_cut:], a[1][a_cut:])
+        b = (b[0][b_cut:], b[1][b_cut:])
+        if not len(a[0]):
+            a = next(first, None)
+        if not len(b[0]):
+            b = next(second, None)
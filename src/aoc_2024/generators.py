@@ -0,0 +1,493 @@
+"""
+Synthetic puzzle inputs for stress testing. Every generator takes a scale n and a
+random.Random and returns the raw text of a valid input for that day. What n
+means depends on the day and is noted on each generator.
+"""
+
+import random
+import string
+from collections.abc import Callable
+
+type Generator = Callable[[int, random.Random], str]
+
+GENERATORS: dict[int, Generator] = {}
+
+
+def generator(day: int) -> Callable[[Generator], Generator]:
+    def register(func: Generator) -> Generator:
+        GENERATORS[day] = func
+        return func
+
+    return register
+
+
+def generate(day: int, n: int, seed: int = 0) -> str:
+    if day not in GENERATORS:
+        msg = f"No generator for day {day}."
+        raise ValueError(msg)
+    return GENERATORS[day](n, random.Random(seed))
+
+
+def perfect_maze(rows: int, cols: int, rng: random.Random) -> list[bytearray]:
+    """
+    A maze of odd size where every open cell is reachable in exactly one way.
+    Open cells are at odd coordinates, the outside is all walls.
+    """
+    rows -= 1 - rows % 2
+    cols -= 1 - cols % 2
+    maze = [bytearray(b"#" * cols) for _ in range(rows)]
+    maze[1][1] = ord(".")
+    stack = [(1, 1)]
+    while stack:
+        row, col = stack[-1]
+        options = []
+        for d_row, d_col in ((-2, 0), (2, 0), (0, -2), (0, 2)):
+            n_row, n_col = row + d_row, col + d_col
+            if not (0 < n_row < rows - 1 and 0 < n_col < cols - 1):
+                continue
+            if maze[n_row][n_col] == ord("#"):
+                options.append((n_row, n_col))
+        if not options:
+            stack.pop()
+            continue
+        n_row, n_col = rng.choice(options)
+        maze[(row + n_row) // 2][(col + n_col) // 2] = ord(".")
+        maze[n_row][n_col] = ord(".")
+        stack.append((n_row, n_col))
+    return maze
+
+
+def maze_path(
+    maze: list[bytearray], start: tuple[int, int], end: tuple[int, int]
+) -> list[tuple[int, int]]:
+    came_from = {start: start}
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for row, col in frontier:
+            for n_row, n_col in (
+                (row - 1, col),
+                (row + 1, col),
+                (row, col - 1),
+                (row, col + 1),
+            ):
+                if maze[n_row][n_col] == ord("#") or (n_row, n_col) in came_from:
+                    continue
+                came_from[(n_row, n_col)] = (row, col)
+                next_frontier.append((n_row, n_col))
+        frontier = next_frontier
+
+    path = [end]
+    while path[-1] != start:
+        path.append(came_from[path[-1]])
+    return path[::-1]
+
+
+def join_maze(maze: list[bytearray]) -> str:
+    return "\n".join(row.decode() for row in maze)
+
+
+@generator(1)
+def day_1(n: int, rng: random.Random) -> str:
+    """n lines of location id pairs, drawn from a shared pool so some repeat."""
+    pool = rng.sample(range(10000, 100000), min(max(n // 4, 10), 90000))
+    lines = []
+    for _ in range(n):
+        lines.append(f"{rng.choice(pool)}   {rng.choice(pool)}")
+    return "\n".join(lines)
+
+
+@generator(2)
+def day_2(n: int, rng: random.Random) -> str:
+    """n reports, roughly half of them safe."""
+    lines = []
+    for _ in range(n):
+        length = rng.randint(5, 8)
+        level = rng.randint(10, 90)
+        sign = rng.choice((-1, 1))
+        report = [level]
+        for _ in range(length - 1):
+            level += sign * rng.randint(1, 3)
+            report.append(level)
+        if rng.random() < 0.5:
+            report[rng.randrange(length)] += rng.randint(-4, 4)
+        lines.append(" ".join(str(x) for x in report))
+    return "\n".join(lines)
+
+
+@generator(3)
+def day_3(n: int, rng: random.Random) -> str:
+    """n instructions, valid or corrupted, between junk characters."""
+    junk = "()[]{}<>,;:!@#$%^&*-+ mulwhy'do"
+    pieces = []
+    for _ in range(n):
+        match rng.randrange(10):
+            case 0:
+                pieces.append("do()")
+            case 1:
+                pieces.append("don't()")
+            case 2 | 3:
+                pieces.append(f"mul({rng.randint(1, 9999)},{rng.randint(1, 999)}]")
+            case _:
+                pieces.append(f"mul({rng.randint(1, 999)},{rng.randint(1, 999)})")
+        pieces.append("".join(rng.choices(junk, k=rng.randint(0, 8))))
+    text = "".join(pieces)
+    return "\n".join(text[i : i + 3000] for i in range(0, len(text), 3000))
+
+
+@generator(4)
+def day_4(n: int, rng: random.Random) -> str:
+    """An n by n word search."""
+    return "\n".join("".join(rng.choices("XMAS", k=n)) for _ in range(n))
+
+
+@generator(5)
+def day_5(n: int, rng: random.Random) -> str:
+    """n page updates checked against a complete set of rules for 49 pages."""
+    pages = rng.sample(range(10, 100), 49)
+    rules = []
+    for i, before in enumerate(pages):
+        for after in pages[i + 1 :]:
+            rules.append(f"{before}|{after}")
+    rng.shuffle(rules)
+
+    updates = []
+    for _ in range(n):
+        update = rng.sample(pages, rng.randrange(5, 24, 2))
+        if rng.random() < 0.5:
+            update.sort(key=pages.index)
+        updates.append(",".join(str(x) for x in update))
+    return "\n".join(rules) + "\n\n" + "\n".join(updates)
+
+
+@generator(6)
+def day_6(n: int, rng: random.Random) -> str:
+    """An n by n lab."""
+    lab = [bytearray(rng.choices(b".#", weights=(985, 15), k=n)) for _ in range(n)]
+    lab[rng.randrange(n)][rng.randrange(n)] = ord("^")
+    return join_maze(lab)
+
+
+@generator(7)
+def day_7(n: int, rng: random.Random) -> str:
+    """n equations of 3 to 12 operands."""
+    lines = []
+    for _ in range(n):
+        nums = [rng.randint(1, 999) for _ in range(rng.randint(3, 12))]
+        target = nums[0]
+        for num in nums[1:]:
+            match rng.randrange(3):
+                case 0:
+                    target += num
+                case 1:
+                    target *= num
+                case _:
+                    target = int(str(target) + str(num))
+        if rng.random() < 0.5:
+            target += 1
+        lines.append(f"{target}: " + " ".join(str(x) for x in nums))
+    return "\n".join(lines)
+
+
+@generator(8)
+def day_8(n: int, rng: random.Random) -> str:
+    """An n by n map with about 4 antennas per row."""
+    frequencies = string.ascii_letters + string.digits
+    antennas = [bytearray(b"." * n) for _ in range(n)]
+    for _ in range(4 * n):
+        antennas[rng.randrange(n)][rng.randrange(n)] = ord(rng.choice(frequencies))
+    return join_maze(antennas)
+
+
+@generator(9)
+def day_9(n: int, rng: random.Random) -> str:
+    """A disk map of n digits."""
+    digits = []
+    for i in range(n):
+        digits.append(str(rng.randint(1, 9) if i % 2 == 0 else rng.randint(0, 9)))
+    return "".join(digits)
+
+
+@generator(10)
+def day_10(n: int, rng: random.Random) -> str:
+    """An n by n topographic map of diagonal slopes with some impassable cells."""
+    heights = []
+    for row in range(n):
+        line = []
+        for col in range(n):
+            if rng.random() < 0.1:
+                line.append(".")
+            else:
+                line.append(str((row + col) % 10))
+        heights.append("".join(line))
+    return "\n".join(heights)
+
+
+@generator(11)
+def day_11(n: int, rng: random.Random) -> str:
+    """n stones."""
+    return " ".join(str(rng.randint(0, 10**7)) for _ in range(n))
+
+
+@generator(12)
+def day_12(n: int, rng: random.Random) -> str:
+    """An n by n garden with patches of the same plant."""
+    garden: list[bytearray] = []
+    for row in range(n):
+        line = bytearray()
+        for col in range(n):
+            if col > 0 and rng.random() < 0.6:
+                line.append(line[col - 1])
+            elif row > 0 and rng.random() < 0.6:
+                line.append(garden[row - 1][col])
+            else:
+                line.append(ord(rng.choice(string.ascii_uppercase)))
+        garden.append(line)
+    return join_maze(garden)
+
+
+@generator(13)
+def day_13(n: int, rng: random.Random) -> str:
+    """n claw machines."""
+    machines = []
+    for _ in range(n):
+        a = (rng.randint(10, 99), rng.randint(10, 99))
+        b = (rng.randint(10, 99), rng.randint(10, 99))
+        presses = (rng.randint(1, 100), rng.randint(1, 100))
+        prize = [a[i] * presses[0] + b[i] * presses[1] for i in range(2)]
+        if rng.random() < 0.5:
+            prize[0] += 1
+        machines.append(
+            f"Button A: X+{a[0]}, Y+{a[1]}\n"
+            f"Button B: X+{b[0]}, Y+{b[1]}\n"
+            f"Prize: X={prize[0]}, Y={prize[1]}"
+        )
+    return "\n\n".join(machines)
+
+
+@generator(14)
+def day_14(n: int, rng: random.Random) -> str:
+    """
+    n robots on the full size floor. Up to 380 of them form a picture at a random
+    step. Part 2 looks for over 350 robots with a neighbour, so past about 450
+    robots the random ones can trip it early.
+    """
+    rows, cols = 103, 101
+    steps = rng.randrange(rows * cols)
+    picture = min(n, 380)
+    lines = []
+    for i in range(n):
+        vel = (rng.randint(-99, 99), rng.randint(-99, 99))
+        if i < picture:
+            # Walk back from a filled square at the picture step
+            end = (30 + i // 20, 40 + i % 20)
+            pos = ((end[0] - vel[0] * steps) % rows, (end[1] - vel[1] * steps) % cols)
+        else:
+            pos = (rng.randrange(rows), rng.randrange(cols))
+        lines.append(f"p={pos[1]},{pos[0]} v={vel[1]},{vel[0]}")
+    return "\n".join(lines)
+
+
+@generator(15)
+def day_15(n: int, rng: random.Random) -> str:
+    """An n by n warehouse and 10 * n moves."""
+    warehouse = [bytearray(b"#" * n)]
+    for _ in range(n - 2):
+        row = bytearray(b"#")
+        row += bytes(rng.choices(b".O#", weights=(70, 25, 5), k=n - 2))
+        row += b"#"
+        warehouse.append(row)
+    warehouse.append(bytearray(b"#" * n))
+    warehouse[rng.randint(1, n - 2)][rng.randint(1, n - 2)] = ord("@")
+
+    moves = "".join(rng.choices("<>^v", k=10 * n))
+    move_lines = [moves[i : i + 1000] for i in range(0, len(moves), 1000)]
+    return join_maze(warehouse) + "\n\n" + "\n".join(move_lines)
+
+
+@generator(16)
+def day_16(n: int, rng: random.Random) -> str:
+    """An n by n maze with some shortcuts."""
+    maze = perfect_maze(n, n, rng)
+    size = len(maze)
+    for _ in range(size // 2):
+        row, col = rng.randrange(1, size - 1), rng.randrange(1, size - 1)
+        maze[row][col] = ord(".")
+    maze[size - 2][1] = ord("S")
+    maze[1][size - 2] = ord("E")
+    return join_maze(maze)
+
+
+@generator(17)
+def day_17(n: int, rng: random.Random) -> str:
+    """
+    A program in the usual shape that prints n digits. Part 2 only has an answer
+    for the rare programs that can print themselves.
+    """
+    a, b = rng.randrange(8), rng.randrange(8)
+    program = f"2,4,1,{a},7,5,1,{b},4,{rng.randrange(8)},0,3,5,5,3,0"
+    register = rng.getrandbits(3 * n) | 1 << (3 * n - 1)
+    return f"Register A: {register}\nRegister B: 0\nRegister C: 0\n\nProgram: {program}"
+
+
+@generator(18)
+def day_18(n: int, rng: random.Random) -> str:
+    """
+    n falling bytes. The memory space is fixed at 71 by 71 by the solution, so n
+    is capped at the number of cells that aren't the start or exit. A random
+    monotone path from the start to the exit is held back until after the first
+    1024 bytes, so part 1 always has a way through.
+    """
+    steps = [(1, 0)] * 70 + [(0, 1)] * 70
+    rng.shuffle(steps)
+    x, y = 0, 0
+    path = []
+    for d_x, d_y in steps[:-1]:
+        x, y = x + d_x, y + d_y
+        path.append((x, y))
+
+    reserved = {(0, 0), (70, 70), *path}
+    cells = [(x, y) for x in range(71) for y in range(71) if (x, y) not in reserved]
+    rng.shuffle(cells)
+    rest = cells[1024:] + path
+    rng.shuffle(rest)
+    cells = cells[:1024] + rest
+    return "\n".join(f"{x},{y}" for x, y in cells[:n])
+
+
+@generator(19)
+def day_19(n: int, rng: random.Random) -> str:
+    """n designs made from 400 towels."""
+    towels: set[str] = set()
+    while len(towels) < 400:
+        towels.add("".join(rng.choices("wubrg", k=rng.randint(1, 8))))
+    towel_list = sorted(towels)
+
+    designs = []
+    for _ in range(n):
+        if rng.random() < 0.5:
+            design = "".join(rng.choices(towel_list, k=rng.randint(3, 10)))
+        else:
+            design = "".join(rng.choices("wubrg", k=rng.randint(20, 60)))
+        designs.append(design)
+    return ", ".join(towel_list) + "\n\n" + "\n".join(designs)
+
+
+@generator(20)
+def day_20(n: int, rng: random.Random) -> str:
+    """An n by n racetrack, a single winding path through walls."""
+    maze = perfect_maze(n, n, rng)
+    size = len(maze)
+    start, end = (size - 2, 1), (1, size - 2)
+    path = maze_path(maze, start, end)
+
+    track = [bytearray(b"#" * size) for _ in range(size)]
+    for row, col in path:
+        track[row][col] = ord(".")
+    track[start[0]][start[1]] = ord("S")
+    track[end[0]][end[1]] = ord("E")
+    return join_maze(track)
+
+
+@generator(21)
+def day_21(n: int, rng: random.Random) -> str:
+    """n door codes."""
+    return "\n".join(f"{rng.randint(0, 999):03}A" for _ in range(n))
+
+
+@generator(22)
+def day_22(n: int, rng: random.Random) -> str:
+    """n initial secret numbers."""
+    return "\n".join(str(rng.randint(1, 16777215)) for _ in range(n))
+
+
+@generator(23)
+def day_23(n: int, rng: random.Random) -> str:
+    """A LAN of n computers with about 13 links each and one planted party."""
+    width = 2
+    while 26**width < n:
+        width += 1
+
+    def name(i: int) -> str:
+        letters = []
+        for _ in range(width):
+            i, letter = divmod(i, 26)
+            letters.append(string.ascii_lowercase[letter])
+        return "".join(letters)
+
+    names = [name(i) for i in rng.sample(range(26**width), n)]
+    links = set()
+    for _ in range(n * 13 // 2):
+        a, b = rng.sample(names, 2)
+        links.add((min(a, b), max(a, b)))
+    party = rng.sample(names, min(n, 14))
+    for i, a in enumerate(party):
+        for b in party[i + 1 :]:
+            links.add((min(a, b), max(a, b)))
+
+    lines = [f"{a}-{b}" for a, b in links]
+    rng.shuffle(lines)
+    return "\n".join(lines)
+
+
+@generator(24)
+def day_24(n: int, rng: random.Random) -> str:
+    """
+    A ripple carry adder for two n bit numbers. Bit numbers are padded to the
+    same width so sorting the wire names sorts the bits.
+    """
+    width = max(2, len(str(n)))
+    used = set()
+
+    def bit(prefix: str, i: int) -> str:
+        return f"{prefix}{i:0{width}}"
+
+    def wire() -> str:
+        while True:
+            candidate = "".join(rng.choices(string.ascii_lowercase, k=3))
+            if candidate not in used and candidate[0] not in "xyz":
+                used.add(candidate)
+                return candidate
+
+    inputs = []
+    for prefix in "xy":
+        for i in range(n):
+            inputs.append(f"{bit(prefix, i)}: {rng.randint(0, 1)}")
+
+    gates = [f"{bit('x', 0)} XOR {bit('y', 0)} -> {bit('z', 0)}"]
+    carry = bit("z", 1) if n == 1 else wire()
+    gates.append(f"{bit('x', 0)} AND {bit('y', 0)} -> {carry}")
+    for i in range(1, n):
+        x, y = bit("x", i), bit("y", i)
+        half_sum, half_carry, carry_through = wire(), wire(), wire()
+        next_carry = bit("z", n) if i == n - 1 else wire()
+        gates.extend(
+            [
+                f"{x} XOR {y} -> {half_sum}",
+                f"{x} AND {y} -> {half_carry}",
+                f"{half_sum} XOR {carry} -> {bit('z', i)}",
+                f"{half_sum} AND {carry} -> {carry_through}",
+                f"{half_carry} OR {carry_through} -> {next_carry}",
+            ]
+        )
+        carry = next_carry
+    rng.shuffle(gates)
+    return "\n".join(inputs) + "\n\n" + "\n".join(gates)
+
+
+@generator(25)
+def day_25(n: int, rng: random.Random) -> str:
+    """n locks and keys."""
+    schematics = []
+    for _ in range(n):
+        heights = [rng.randint(0, 5) for _ in range(5)]
+        is_lock = rng.random() < 0.5
+        rows = []
+        for row in range(7):
+            line = ""
+            for height in heights:
+                filled = row <= height if is_lock else row >= 6 - height
+                line += "#" if filled else "."
+            rows.append(line)
+        schematics.append("\n".join(rows))
+    return "\n\n".join(schematics)
@@ -0,0 +1,151 @@
+from collections.abc import Iterator, Sequence
+
+from aoc.datatypes import Coord
+
+# Direction indices, the first four are the orthogonal ones in clockwise order so
+# turning right is (direction + 1) % 4.
+NORTH, EAST, SOUTH, WEST = 0, 1, 2, 3
+NORTH_EAST, SOUTH_EAST, SOUTH_WEST, NORTH_WEST = 4, 5, 6, 7
+
+DIRECTIONS = (
+    Coord(-1, 0),
+    Coord(0, 1),
+    Coord(1, 0),
+    Coord(0, -1),
+    Coord(-1, 1),
+    Coord(1, 1),
+    Coord(1, -1),
+    Coord(-1, -1),
+)
+ORTHOGONAL = (NORTH, EAST, SOUTH, WEST)
+
+
+def _bounds_masks(rows: int, cols: int) -> bytes:
+    # Whether a step stays on the map only depends on the row for the row
+    # component and on the column for the column component.
+    def allowed(position: int, size: int, axis: int) -> int:
+        mask = 0
+        for direction, step in enumerate(DIRECTIONS):
+            if 0 <= position + step[axis] < size:
+                mask |= 1 << direction
+        return mask
+
+    col_masks = bytes(allowed(col, cols, 1) for col in range(cols))
+    masks = bytearray()
+    for row in range(rows):
+        row_mask = allowed(row, rows, 0)
+        table = bytes(x & row_mask for x in range(256))
+        masks += col_masks.translate(table)
+    return bytes(masks)
+
+
+class Grid:
+    """
+    A rectangular map stored row by row in a flat byte string. Cells are addressed
+    by their integer index, stepping is a single addition of an entry in offsets.
+    """
+
+    __slots__ = ("_masks", "cells", "cols", "offsets", "rows")
+
+    def __init__(self, rows: int, cols: int, cells: bytes) -> None:
+        if len(cells) != rows * cols:
+            msg = f"Expected {rows * cols} cells, got {len(cells)}."
+            raise ValueError(msg)
+        self.rows = rows
+        self.cols = cols
+        self.cells = bytes(cells)
+        self.offsets = tuple(step.row * cols + step.col for step in DIRECTIONS)
+        self._masks: bytes | None = None
+
+    @classmethod
+    def from_lines(cls, lines: Sequence[str]) -> "Grid":
+        cols = len(lines[0])
+        if any(len(line) != cols for line in lines):
+            msg = "Grid lines are not all the same length."
+            raise ValueError(msg)
+        return cls(len(lines), cols, "".join(lines).encode())
+
+    @classmethod
+    def filled(cls, rows: int, cols: int, char: str = ".") -> "Grid":
+        return cls(rows, cols, char.encode() * (rows * cols))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __getitem__(self, index: int) -> int:
+        return self.cells[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Grid):
+            return NotImplemented
+        return (self.rows, self.cols, self.cells) == (
+            other.rows,
+            other.cols,
+            other.cells,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.rows, self.cols, self.cells))
+
+    def __reduce__(self) -> tuple[type["Grid"], tuple[int, int, bytes]]:
+        return Grid, (self.rows, self.cols, self.cells)
+
+    @property
+    def masks(self) -> bytes:
+        """Per cell, bit d is set when a step in direction d stays on the map."""
+        if self._masks is None:
+            self._masks = _bounds_masks(self.rows, self.cols)
+        return self._masks
+
+    def index(self, coord: Coord) -> int:
+        return coord.row * self.cols + coord.col
+
+    def coord(self, index: int) -> Coord:
+        row, col = divmod(index, self.cols)
+        return Coord(row, col)
+
+    def in_bounds(self, coord: Coord) -> bool:
+        return 0 <= coord.row < self.rows and 0 <= coord.col < self.cols
+
+    def char(self, index: int) -> str:
+        return chr(self.cells[index])
+
+    def find(self, char: str) -> int:
+        index = self.cells.find(char.encode())
+        if index == -1:
+            msg = f"{char!r} is not on the map."
+            raise ValueError(msg)
+        return index
+
+    def find_all(self, char: str) -> list[int]:
+        found = []
+        value = ord(char)
+        index = self.cells.find(value)
+        while index != -1:
+            found.append(index)
+            index = self.cells.find(value, index + 1)
+        return found
+
+    def step(self, index: int, direction: int) -> int | None:
+        if not self.masks[index] >> direction & 1:
+            return None
+        return index + self.offsets[direction]
+
+    def neighbors(
+        self, index: int, directions: Sequence[int] = ORTHOGONAL
+    ) -> Iterator[int]:
+        mask = self.masks[index]
+        for direction in directions:
+            if mask >> direction & 1:
+                yield index + self.offsets[direction]
+
+    def replace(self, index: int, char: str) -> "Grid":
+        cells = bytearray(self.cells)
+        cells[index] = ord(char)
+        grid = Grid(self.rows, self.cols, bytes(cells))
+        grid._masks = self._masks
+        return grid
+
+    def lines(self) -> list[str]:
+        text = self.cells.decode()
+        return [text[i : i + self.cols] for i in range(0, len(text), self.cols)]
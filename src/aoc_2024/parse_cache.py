@@ -0,0 +1,127 @@
+import functools
+import hashlib
+import os
+import pickle
+import sys
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Concatenate
+
+from aoc.puzzle import PuzzleInput
+
+from aoc_2024.streaming import AnyInput, StreamingInput
+
+CACHE_DIR_ENV = "AOC_PARSE_CACHE"
+# Parses kept in memory, least recently used ones are dropped first. Enough for
+# every parser of every day to stay cached through a run of all of them.
+CACHE_SIZE = 64
+
+_cache: OrderedDict[str, Any] = OrderedDict()
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively swap mutable containers for read-only ones, so one part can't
+    change what the other part gets back from the cache.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if type(value) in (list, tuple):
+        return tuple(freeze(x) for x in value)
+    # Namedtuples like Coord can still hold mutable fields.
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        namedtuple: Any = type(value)
+        return namedtuple._make(freeze(x) for x in value)
+    if type(value) in (set, frozenset):
+        return frozenset(value)
+    # If numpy was never imported nothing can be an array, don't import it here.
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        # A view can be made writeable again through its base, copy it.
+        frozen = value.copy()
+        frozen.setflags(write=False)
+        return frozen
+    return value
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+@functools.cache
+def module_fingerprint(name: str) -> bytes:
+    """
+    A hash of a module's source, so results saved to disk by an older version
+    of a parser, or of anything it calls in its module, are never loaded.
+    """
+    path = getattr(sys.modules.get(name), "__file__", None)
+    if path is None:
+        return b""
+    return hashlib.sha256(Path(path).read_bytes()).digest()
+
+
+def cache_key(func: Callable[..., Any], puzzle: PuzzleInput, *args: Any) -> str:
+    digest = hashlib.sha256(puzzle.raw.encode())
+    digest.update(f"{func.__module__}.{func.__qualname__}".encode())
+    digest.update(module_fingerprint(func.__module__))
+    digest.update(func.__code__.co_code)
+    digest.update(repr(func.__code__.co_consts).encode())
+    digest.update(repr((puzzle.test, args)).encode())
+    return digest.hexdigest()
+
+
+def cache_dir() -> Path | None:
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cached_parse[I: AnyInput, **P, R](
+    func: Callable[Concatenate[I, P], R],
+) -> Callable[Concatenate[I, P], R]:
+    """
+    Memoize a parser on the contents of the puzzle input. Results are frozen,
+    callers that need to modify them have to make their own copy. Setting
+    AOC_PARSE_CACHE to a directory also persists the results between runs.
+
+    Parsers may be generators. Streaming inputs are never cached and get the
+    generator back as is, every other input gets it collected into a tuple.
+    """
+
+    @functools.wraps(func)
+    def wrapper(puzzle: I, /, *args: P.args, **kwargs: P.kwargs) -> R:
+        if isinstance(puzzle, StreamingInput):
+            return func(puzzle, *args, **kwargs)
+
+        key = cache_key(func, puzzle, *args, *sorted(kwargs.items()))
+        if key in _cache:
+            _cache.move_to_end(key)
+            cached: R = _cache[key]
+            return cached
+
+        directory = cache_dir()
+        path = None if directory is None else directory / f"{key}.pickle"
+        if path is not None and path.exists():
+            result = pickle.loads(path.read_bytes())
+        else:
+            result = func(puzzle, *args, **kwargs)
+            if isinstance(result, Iterator):
+                result = list(result)
+            if path is not None:
+                # Parts may run in parallel processes, never expose a partial file.
+                partial = path.with_suffix(f".{os.getpid()}.partial")
+                partial.write_bytes(pickle.dumps(result))
+                partial.replace(path)
+
+        frozen: R = freeze(result)
+        _cache[key] = frozen
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+        return frozen
+
+    return wrapper
@@ -0,0 +1,168 @@
+"""
+Opt-in profiling of a solve. Set AOC_PROFILE to a comma separated list of
+profilers, or pass --profile to the runner, and each part writes its profiles
+to AOC_PROFILE_DIR:
+
+- cprofile: a deterministic profile, NAME.pstats
+- sample: a sampling profile as collapsed stacks for flamegraphs, NAME.collapsed
+- memory: a tracemalloc snapshot at the end of the solve, NAME.tracemalloc
+
+Any profiler also records the sections solutions mark with span() into
+NAME.spans.
+"""
+
+import contextlib
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from types import FrameType
+
+PROFILE_ENV = "AOC_PROFILE"
+PROFILE_DIR_ENV = "AOC_PROFILE_DIR"
+PROFILE_INTERVAL_ENV = "AOC_PROFILE_INTERVAL"
+PROFILERS = ("cprofile", "sample", "memory")
+DEFAULT_PROFILE_DIR = Path("profiles")
+DEFAULT_INTERVAL = 0.001
+
+# None unless a profile is running, so span() costs one check otherwise.
+_spans: list[tuple[str, float]] | None = None
+
+
+def parse_profilers(value: str) -> list[str]:
+    profilers = [name.strip() for name in value.split(",") if name.strip()]
+    for name in profilers:
+        if name not in PROFILERS:
+            msg = f"Unknown profiler {name!r}, expected one of {', '.join(PROFILERS)}."
+            raise ValueError(msg)
+    # cProfile sees every thread, so it would mostly measure the sampler.
+    if "cprofile" in profilers and "sample" in profilers:
+        msg = "The cprofile and sample profilers can't run at the same time."
+        raise ValueError(msg)
+    return profilers
+
+
+def enabled_profilers() -> list[str]:
+    return parse_profilers(os.environ.get(PROFILE_ENV, ""))
+
+
+def profile_dir() -> Path:
+    path = Path(os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """Mark a section of a solve so its time shows up in profiles."""
+    spans = _spans
+    if spans is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.append((name, time.perf_counter() - start))
+
+
+def frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).stem}:{code.co_qualname}"
+
+
+class Sampler:
+    """
+    Samples the stack of one thread from a background thread, up to the root
+    frame. Counts are kept per stack, root first, which is the collapsed format
+    flamegraph tools read.
+    """
+
+    def __init__(self, thread_id: int, root: FrameType, interval: float) -> None:
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                if frame is self.root:
+                    break
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path) -> None:
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        path.write_text("\n".join(lines) + "\n")
+
+
+@contextlib.contextmanager
+def profile(
+    name: str,
+    profilers: Sequence[str] | None = None,
+    directory: Path | None = None,
+) -> Iterator[None]:
+    """
+    Profile the body with the given profilers, by default the ones in
+    AOC_PROFILE. Does nothing when no profiler is enabled.
+    """
+    global _spans
+
+    if profilers is None:
+        profilers = enabled_profilers()
+    if not profilers:
+        yield
+        return
+    if directory is None:
+        directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    spans: list[tuple[str, float]] = []
+    _spans = spans
+    profiler = sampler = None
+    if "memory" in profilers:
+        tracemalloc.start()
+    if "sample" in profilers:
+        interval = float(os.environ.get(PROFILE_INTERVAL_ENV, DEFAULT_INTERVAL))
+        # The frame that entered the with block, above the contextmanager frames.
+        root = sys._getframe(2)
+        sampler = Sampler(threading.get_ident(), root, interval)
+        sampler.start()
+    if "cprofile" in profilers:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(directory / f"{name}.pstats")
+        if sampler is not None:
+            sampler.stop()
+            sampler.write(directory / f"{name}.collapsed")
+        if "memory" in profilers:
+            tracemalloc.take_snapshot().dump(str(directory / f"{name}.tracemalloc"))
+            tracemalloc.stop()
+        _spans = None
+        if spans:
+            lines = [f"{label}\t{seconds:.6f}" for label, seconds in spans]
+            (directory / f"{name}.spans").write_text("\n".join(lines) + "\n")
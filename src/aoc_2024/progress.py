@@ -0,0 +1,154 @@
+"""
+Progress reporting for long running loops. Wrapping a loop in progress() is
+free unless a reporter is set: by default there is one only when stderr is a
+terminal, and AOC_PROGRESS=0 turns it off entirely. Updates are rate limited,
+and worker processes can send theirs to the parent through a queue.
+"""
+
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator, Sized
+from multiprocessing.queues import Queue
+from typing import TYPE_CHECKING, NamedTuple, Protocol, TextIO
+
+if TYPE_CHECKING:
+    from rich.progress import Progress
+
+PROGRESS_ENV = "AOC_PROGRESS"
+DEFAULT_INTERVAL = 0.1
+
+
+class Update(NamedTuple):
+    label: str
+    desc: str
+    done: int
+    total: int | None
+    finished: bool = False
+
+
+class Reporter(Protocol):
+    def update(self, desc: str, done: int, total: int | None) -> None: ...
+
+    def finish(self, desc: str, done: int, total: int | None) -> None: ...
+
+
+class TerminalReporter:
+    """Redraws a single status line."""
+
+    def __init__(self, stream: TextIO = sys.stderr) -> None:
+        self.stream = stream
+
+    def _write(self, desc: str, done: int, total: int | None) -> None:
+        if total:
+            status = f"{done}/{total} ({done / total:.0%})"
+        else:
+            status = str(done)
+        self.stream.write(f"\r{desc or 'progress'}: {status}\x1b[K")
+        self.stream.flush()
+
+    def update(self, desc: str, done: int, total: int | None) -> None:
+        self._write(desc, done, total)
+
+    def finish(self, desc: str, done: int, total: int | None) -> None:
+        self._write(desc, done, total)
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+class QueueReporter:
+    """Forwards updates from a worker process to whoever reads the queue."""
+
+    def __init__(self, queue: "Queue[Update | None]", label: str) -> None:
+        self.queue = queue
+        self.label = label
+
+    def update(self, desc: str, done: int, total: int | None) -> None:
+        self.queue.put(Update(self.label, desc, done, total))
+
+    def finish(self, desc: str, done: int, total: int | None) -> None:
+        self.queue.put(Update(self.label, desc, done, total, finished=True))
+
+
+_reporter: Reporter | None = None
+_configured = False
+
+
+def enabled() -> bool:
+    return os.environ.get(PROGRESS_ENV, "1") not in ("0", "")
+
+
+def default_reporter() -> Reporter | None:
+    if enabled() and sys.stderr.isatty():
+        return TerminalReporter()
+    return None
+
+
+def get_reporter() -> Reporter | None:
+    global _reporter, _configured
+    if not _configured:
+        _reporter = default_reporter()
+        _configured = True
+    return _reporter
+
+
+def set_reporter(reporter: Reporter | None) -> None:
+    global _reporter, _configured
+    _reporter = reporter
+    _configured = True
+
+
+def _report[T](
+    iterable: Iterable[T],
+    reporter: Reporter,
+    desc: str,
+    total: int | None,
+    interval: float,
+) -> Iterator[T]:
+    done = 0
+    reporter.update(desc, done, total)
+    last = time.monotonic()
+    try:
+        for item in iterable:
+            yield item
+            done += 1
+            now = time.monotonic()
+            if now - last >= interval:
+                reporter.update(desc, done, total)
+                last = now
+    finally:
+        reporter.finish(desc, done, total)
+
+
+def progress[T](
+    iterable: Iterable[T],
+    desc: str = "",
+    total: int | None = None,
+    interval: float = DEFAULT_INTERVAL,
+) -> Iterable[T]:
+    """
+    Report how far a loop has got. Without a reporter the iterable is returned
+    untouched.
+    """
+    reporter = get_reporter()
+    if reporter is None:
+        return iterable
+    if total is None and isinstance(iterable, Sized):
+        total = len(iterable)
+    return _report(iterable, reporter, desc, total, interval)
+
+
+def drain(queue: "Queue[Update | None]", render: "Progress") -> None:
+    """
+    Feed updates from a queue to a rich Progress until a None arrives, one
+    progress bar per worker and loop.
+    """
+    tasks = {}
+    while (update := queue.get()) is not None:
+        key = (update.label, update.desc)
+        if key not in tasks:
+            description = f"{update.label} {update.desc}".strip()
+            tasks[key] = render.add_task(description, total=update.total)
+        render.update(tasks[key], completed=update.done, total=update.total)
+        if update.finished:
+            render.remove_task(tasks.pop(key))
@@ -0,0 +1,111 @@
+"""
+Optional visualization of solves. Solutions hand frames to emit() instead of
+printing, frames are only built while someone is capturing them and only drawn
+when asked, so solving does no I/O. Run a part with its frames drawn with:
+
+    python -m aoc_2024.render DAY PART [--test]
+"""
+
+import argparse
+import contextlib
+import importlib
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import NamedTuple
+
+from rich.console import Console
+from rich.text import Text
+
+from aoc_2024.grid import Grid
+
+STYLES = {
+    "#": "bright_black",
+    "X": "bold yellow",
+    "O": "bold yellow",
+    "S": "bold green",
+    "E": "bold red",
+}
+
+
+class Frame(NamedTuple):
+    title: str
+    lines: Sequence[str]
+
+
+# None unless frames are being captured, so emit() costs one check otherwise.
+_frames: list[Frame] | None = None
+
+
+def capturing() -> bool:
+    return _frames is not None
+
+
+def emit(title: str, build: Callable[[], Sequence[str]]) -> None:
+    """Record a frame, build is only called when frames are being captured."""
+    if _frames is not None:
+        _frames.append(Frame(title, build()))
+
+
+@contextlib.contextmanager
+def capture() -> Iterator[list[Frame]]:
+    global _frames
+    previous = _frames
+    frames: list[Frame] = []
+    _frames = frames
+    try:
+        yield frames
+    finally:
+        _frames = previous
+
+
+def overlay(grid: Grid, cells: Iterable[int], char: str) -> list[str]:
+    """The lines of a grid with the given cells drawn as char."""
+    drawn = bytearray(grid.cells)
+    value = ord(char)
+    for cell in cells:
+        drawn[cell] = value
+    return Grid(grid.rows, grid.cols, bytes(drawn)).lines()
+
+
+def to_text(frame: Frame) -> Text:
+    text = Text()
+    for line in frame.lines:
+        for char in line:
+            text.append(char, style=STYLES.get(char, ""))
+        text.append("\n")
+    return text
+
+
+def render(frames: Iterable[Frame], console: Console | None = None) -> None:
+    if console is None:
+        console = Console()
+    for frame in frames:
+        console.rule(frame.title)
+        console.print(to_text(frame), end="")
+
+
+def main(argv: list[str] | None = None) -> None:
+    # Imported here so the days that emit frames don't pull in the runner.
+    from aoc_2024.runner import discover_package, load_puzzle
+
+    parser = argparse.ArgumentParser(description="Draw the frames a part emits.")
+    parser.add_argument("day", type=int)
+    parser.add_argument("part", type=int, choices=(1, 2))
+    parser.add_argument("--base", default="base", help="Entry point name to load")
+    parser.add_argument("--test", action="store_true", help="Use the test input")
+    args = parser.parse_args(argv)
+
+    package = discover_package(args.base)
+    puzzle = load_puzzle(package, args.day, args.test)
+    module = importlib.import_module(f"{package}.day_{args.day}")
+    # Under python -m this file is __main__, the days emit into aoc_2024.render.
+    frames_module = importlib.import_module("aoc_2024.render")
+    with frames_module.capture() as frames:
+        answer = getattr(module, f"part_{args.part}")(puzzle)
+
+    console = Console()
+    render(frames, console)
+    console.print(f"Answer: {answer}")
+
+
+if __name__ == "__main__":
+    main()
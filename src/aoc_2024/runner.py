@@ -0,0 +1,244 @@
+import argparse
+import contextlib
+import importlib
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib import metadata, resources
+from importlib.resources.abc import Traversable
+from multiprocessing.queues import Queue
+from typing import NamedTuple
+
+from aoc.puzzle import PuzzleInput
+from rich.console import Console
+from rich.progress import Progress
+from rich.table import Table
+
+from aoc_2024 import progress
+from aoc_2024.parse_cache import CACHE_DIR_ENV
+from aoc_2024.profiling import PROFILE_DIR_ENV, PROFILE_ENV, parse_profilers, profile
+from aoc_2024.streaming import AnyInput, StreamingInput
+
+ENTRY_POINT_GROUP = "aoc"
+
+# Set in worker processes when the parent is showing progress.
+_progress_queue: "Queue[progress.Update | None] | None" = None
+
+
+class Task(NamedTuple):
+    package: str
+    day: int
+    part: int
+    test: bool = False
+    stream: bool = False
+
+
+class PartResult(NamedTuple):
+    day: int
+    part: int
+    answer: str | None
+    wall: float
+    cpu: float
+    peak_rss: int
+    error: str | None = None
+
+
+def discover_package(name: str = "base") -> str:
+    for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name == name:
+            return entry_point.value
+    msg = f"No '{ENTRY_POINT_GROUP}' entry point called {name!r} is installed."
+    raise ValueError(msg)
+
+
+def discover_days(package: str) -> list[int]:
+    module = importlib.import_module(package)
+    days = []
+    for attr in module.__all__:
+        if attr.startswith("day_"):
+            days.append(int(attr.removeprefix("day_")))
+    return sorted(days)
+
+
+def make_puzzle(raw: str, test: bool = False) -> PuzzleInput:
+    raw = raw.rstrip("\n")
+    return PuzzleInput(raw=raw, lines=raw.splitlines(), test=test)
+
+
+def input_file(package: str, day: int, test: bool = False) -> Traversable:
+    filename = "test.txt" if test else "input.txt"
+    return resources.files(package) / "inputs" / f"day_{day}" / filename
+
+
+def load_puzzle(package: str, day: int, test: bool = False) -> PuzzleInput:
+    return make_puzzle(input_file(package, day, test).read_text(), test)
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return usage
+    return usage * 1024
+
+
+def init_worker(queue: "Queue[progress.Update | None] | None") -> None:
+    global _progress_queue
+    _progress_queue = queue
+
+
+def run_part(task: Task) -> PartResult:
+    with contextlib.ExitStack() as stack:
+        puzzle: AnyInput
+        if task.stream:
+            traversable = input_file(task.package, task.day, task.test)
+            path = stack.enter_context(resources.as_file(traversable))
+            puzzle = stack.enter_context(StreamingInput(path, task.test))
+        else:
+            puzzle = load_puzzle(task.package, task.day, task.test)
+        return solve_part(task, puzzle)
+
+
+def solve_part(task: Task, puzzle: AnyInput) -> PartResult:
+    module = importlib.import_module(f"{task.package}.day_{task.day}")
+    solve = getattr(module, f"part_{task.part}")
+
+    name = f"day_{task.day}.part_{task.part}"
+    if task.test:
+        name += ".test"
+    if _progress_queue is not None:
+        progress.set_reporter(progress.QueueReporter(_progress_queue, name))
+    else:
+        # Workers share the terminal, only the parent may draw on it.
+        progress.set_reporter(None)
+
+    answer = error = None
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        # Days print grids and debug output, keep that out of the report.
+        with contextlib.redirect_stdout(io.StringIO()), profile(name):
+            answer = str(solve(puzzle))
+    except Exception as e:  # noqa: BLE001
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    return PartResult(task.day, task.part, answer, wall, cpu, peak_rss(), error)
+
+
+def run_all(
+    tasks: Iterable[Task], workers: int | None = None, show_progress: bool = False
+) -> list[PartResult]:
+    results = []
+    # The pool uses spawn anyway when replacing workers, the queue must match.
+    context = multiprocessing.get_context("spawn")
+    queue = listener = None
+    render: contextlib.AbstractContextManager[object] = contextlib.nullcontext()
+    if show_progress:
+        queue = context.Queue()
+        render = Progress(transient=True)
+        listener = threading.Thread(target=progress.drain, args=(queue, render))
+        listener.start()
+
+    # One process per part so peak RSS is measured per part, not per worker.
+    with (
+        render,
+        ProcessPoolExecutor(
+            max_workers=workers,
+            max_tasks_per_child=1,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(queue,),
+        ) as pool,
+    ):
+        try:
+            futures = [pool.submit(run_part, task) for task in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+        finally:
+            if queue is not None and listener is not None:
+                queue.put(None)
+                listener.join()
+    results.sort(key=lambda x: (x.day, x.part))
+    return results
+
+
+def build_table(results: list[PartResult], total_wall: float) -> Table:
+    table = Table(title=f"Advent of Code 2024 ({total_wall:.2f}s wall)")
+    table.add_column("Day", justify="right")
+    table.add_column("Part", justify="right")
+    table.add_column("Answer")
+    table.add_column("Wall (s)", justify="right")
+    table.add_column("CPU (s)", justify="right")
+    table.add_column("Peak RSS (MiB)", justify="right")
+    for result in results:
+        if result.error is not None:
+            answer = f"[red]{result.error}[/red]"
+        else:
+            answer = str(result.answer)
+        table.add_row(
+            str(result.day),
+            str(result.part),
+            answer,
+            f"{result.wall:.3f}",
+            f"{result.cpu:.3f}",
+            f"{result.peak_rss / 2**20:.1f}",
+        )
+    return table
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run every day and part in parallel.")
+    parser.add_argument("days", nargs="*", type=int, help="Days to run, default all")
+    parser.add_argument("--base", default="base", help="Entry point name to load")
+    parser.add_argument("--test", action="store_true", help="Use the test inputs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--parse-cache", help="Directory to persist parsed inputs between parts"
+    )
+    parser.add_argument(
+        "--profile",
+        type=parse_profilers,
+        help="Comma separated profilers to run each part under: cprofile, sample, "
+        "memory",
+    )
+    parser.add_argument("--profile-dir", help="Directory to write the profiles to")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Memory map the inputs and stream their lines where the day allows it",
+    )
+    args = parser.parse_args(argv)
+
+    # Inherited by the worker processes.
+    if args.parse_cache is not None:
+        os.environ[CACHE_DIR_ENV] = args.parse_cache
+    if args.profile is not None:
+        os.environ[PROFILE_ENV] = ",".join(args.profile)
+    if args.profile_dir is not None:
+        os.environ[PROFILE_DIR_ENV] = args.profile_dir
+
+    package = discover_package(args.base)
+    days = args.days or discover_days(package)
+    tasks = [
+        Task(package, day, part, args.test, args.stream)
+        for day in days
+        for part in (1, 2)
+    ]
+
+    start = time.perf_counter()
+    show_progress = progress.enabled() and sys.stderr.isatty()
+    results = run_all(tasks, workers=args.workers, show_progress=show_progress)
+    total_wall = time.perf_counter() - start
+    Console().print(build_table(results, total_wall))
+
+
+if __name__ == "__main__":
+    main()
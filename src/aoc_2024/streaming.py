@@ -0,0 +1,93 @@
+import mmap
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+from aoc.puzzle import PuzzleInput
+
+
+class StreamingInput:
+    """
+    A puzzle input backed by a memory mapped file. Lines are produced one at a
+    time, so parsers that consume them as they go run in constant memory no
+    matter how large the file is. raw and lines still work for days that need
+    everything at once, but they read the whole file.
+    """
+
+    def __init__(self, path: Path, test: bool = False) -> None:
+        self.path = path
+        self.test = test
+        self._file = path.open("rb")
+        self._map: mmap.mmap | None = None
+        # Empty files can't be mapped.
+        if path.stat().st_size > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def buffer(self) -> bytes | mmap.mmap:
+        if self._map is None:
+            return b""
+        return self._map
+
+    def iter_byte_lines(self) -> Iterator[bytes]:
+        buffer = self.buffer
+        end = len(buffer)
+        # Like splitlines after stripping trailing newlines.
+        while end > 0 and buffer[end - 1 : end] in (b"\n", b"\r"):
+            end -= 1
+        start = 0
+        while start < end:
+            stop = buffer.find(b"\n", start, end)
+            if stop == -1:
+                stop = end
+            yield buffer[start:stop].rstrip(b"\r")
+            start = stop + 1
+
+    def iter_lines(self) -> Iterator[str]:
+        for line in self.iter_byte_lines():
+            yield line.decode()
+
+    def iter_chunks(self, size: int) -> Iterator[bytes]:
+        """Blocks of about size bytes that only ever end after a whole line."""
+        buffer = self.buffer
+        start = 0
+        while start < len(buffer):
+            stop = buffer.find(b"\n", min(start + size, len(buffer)) - 1)
+            stop = len(buffer) if stop == -1 else stop + 1
+            yield buffer[start:stop]
+            start = stop
+
+    @property
+    def raw(self) -> str:
+        return bytes(self.buffer).decode().rstrip("\n")
+
+    @property
+    def lines(self) -> list[str]:
+        return self.raw.splitlines()
+
+
+type AnyInput = PuzzleInput | StreamingInput
+
+
+def iter_lines(puzzle: AnyInput) -> Iterable[str]:
+    """The lines of either kind of input, streamed when the input allows it."""
+    if isinstance(puzzle, StreamingInput):
+        return puzzle.iter_lines()
+    return puzzle.lines
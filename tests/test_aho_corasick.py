@@ -0,0 +1,34 @@
+import random
+from collections import Counter
+
+import pytest
+
+from aoc_2024.aho_corasick import AhoCorasick
+
+
+def naive_count(text: bytes, pattern: bytes) -> int:
+    """Overlapping occurrences, str.count only finds disjoint ones."""
+    return sum(text.startswith(pattern, i) for i in range(len(text)))
+
+
+def test_matches_naive_count() -> None:
+    rng = random.Random(0)
+    for _ in range(200):
+        text = bytes(rng.choices(b"ab", k=rng.randint(0, 40)))
+        patterns = [
+            bytes(rng.choices(b"abc", k=rng.randint(1, 4)))
+            for _ in range(rng.randint(1, 6))
+        ]
+        found = Counter(index for _, index in AhoCorasick(patterns).search(text))
+        for index, pattern in enumerate(patterns):
+            assert found[index] == naive_count(text, pattern)
+
+
+def test_match_ends() -> None:
+    matches = sorted(AhoCorasick([b"aa", b"a"]).search(b"aaa"))
+    assert matches == [(1, 1), (2, 0), (2, 1), (3, 0), (3, 1)]
+
+
+def test_empty_pattern() -> None:
+    with pytest.raises(ValueError):
+        AhoCorasick([b"a", b""])
@@ -0,0 +1,6 @@
+from aoc_2024.bench import sweep_part
+
+
+def test_sweep_day_18() -> None:
+    points = sweep_part("aoc_2024", 18, 1, [1024, 2048], 1)
+    assert [point.size for point in points] == [1024, 2048]
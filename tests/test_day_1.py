@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from aoc_2024 import day_1, external_sort
+from aoc_2024.generators import generate
+from aoc_2024.runner import make_puzzle
+from aoc_2024.streaming import StreamingInput
+
+
+@pytest.fixture
+def small_budget(monkeypatch: pytest.MonkeyPatch) -> int:
+    # Small enough for dozens of runs per column and several merge passes.
+    budget = 64 * 2**10
+    monkeypatch.setenv(external_sort.MEMORY_BUDGET_ENV, str(budget))
+    return budget
+
+
+def test_out_of_core_matches_in_memory(tmp_path: Path, small_budget: int) -> None:
+    raw = generate(1, 20000, seed=3)
+    path = tmp_path / "input.txt"
+    path.write_text(raw)
+    puzzle = make_puzzle(raw)
+    with StreamingInput(path) as streamed:
+        assert day_1.out_of_core(streamed) == small_budget
+        assert day_1.part_1(streamed) == day_1.distance(*day_1.parse_input(puzzle))
+        assert day_1.part_2(streamed) == day_1.similarity(*day_1.parse_input(puzzle))
+
+
+def test_out_of_core_rejects_malformed(tmp_path: Path, small_budget: int) -> None:
+    lines = generate(1, 20000, seed=3).splitlines()
+    lines[10000] = "12345   x2345"
+    path = tmp_path / "input.txt"
+    path.write_text("\n".join(lines))
+    with StreamingInput(path) as streamed, pytest.raises(ValueError):
+        day_1.distance_external(streamed, small_budget)
@@ -0,0 +1,15 @@
+import pytest
+
+from aoc_2024 import day_2
+from aoc_2024.parse_cache import clear_cache
+from aoc_2024.runner import make_puzzle
+
+pytest.importorskip("numpy")
+
+
+def test_parse_csr_empty() -> None:
+    clear_cache()
+    levels, offsets = day_2.parse_csr(make_puzzle(""))
+    assert len(levels) == 0
+    assert offsets.tolist() == [0]
+    assert day_2.count_safe_csr(levels, offsets) == (0, 0)
@@ -0,0 +1,21 @@
+import random
+
+from aoc_2024 import day_4
+from aoc_2024.grid import Grid
+
+
+def test_count_words_matches_count_word() -> None:
+    rng = random.Random(0)
+    lines = ["".join(rng.choices("XMAS", k=12)) for _ in range(9)]
+    grid = Grid.from_lines(lines)
+    words = ["XMAS", "SAS", "XMAS", "A", "MAM"]
+    assert day_4.count_words(grid, words) == [
+        day_4.count_word(grid, word) for word in words
+    ]
+
+
+def test_locate_words_keeps_order() -> None:
+    grid = Grid.from_lines(["XMAS"])
+    found = day_4.locate_words(grid, ["SAM", "XMAS", "SAM"])
+    assert [len(places) for places in found] == [1, 1, 1]
+    assert found[0] == found[2]
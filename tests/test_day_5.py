@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from aoc_2024 import day_5
+from aoc_2024.runner import load_puzzle
+
+
+def totals(backlog: day_5.Backlog) -> tuple[int, int]:
+    return backlog.valid_total, backlog.corrected_total
+
+
+def rebuilt(backlog: day_5.Backlog) -> tuple[int, int]:
+    return totals(day_5.Backlog(backlog.rules, backlog.page_sets))
+
+
+def test_totals_match_parts() -> None:
+    puzzle = load_puzzle("aoc_2024", 5, test=True)
+    backlog = day_5.Backlog.from_puzzle(puzzle)
+    assert totals(backlog) == (day_5.part_1(puzzle), day_5.part_2(puzzle))
+
+
+def test_changes_match_rebuild() -> None:
+    backlog = day_5.Backlog.from_puzzle(load_puzzle("aoc_2024", 5, test=True))
+    pages = sorted(backlog.containing)
+    rng = random.Random(0)
+    for _ in range(200):
+        before, after = rng.sample(pages, 2)
+        rules, previous = dict(backlog.rules), totals(backlog)
+        try:
+            if rng.random() < 0.5:
+                backlog.add_rule(before, after)
+            else:
+                backlog.remove_rule(before, after)
+        except ValueError:
+            assert backlog.rules == rules
+            assert totals(backlog) == previous
+            continue
+        assert totals(backlog) == rebuilt(backlog)
+
+
+def test_cycle_rolls_back() -> None:
+    backlog = day_5.Backlog.from_puzzle(load_puzzle("aoc_2024", 5, test=True))
+    rules, previous = dict(backlog.rules), totals(backlog)
+    with pytest.raises(ValueError):
+        backlog.add_rule(53, 47)
+    assert backlog.rules == rules
+    assert totals(backlog) == previous
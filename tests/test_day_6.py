@@ -0,0 +1,64 @@
+import random
+
+import pytest
+from aoc.puzzle import PuzzleInput
+
+from aoc_2024 import day_6
+from aoc_2024.grid import Grid
+from aoc_2024.runner import load_puzzle, make_puzzle
+
+
+def lab() -> tuple[Grid, tuple[int, int]]:
+    grid, guard = day_6.parse_maze(load_puzzle("aoc_2024", 6, test=True))
+    return grid, (guard, day_6.NORTH)
+
+
+def test_parallel_matches_serial() -> None:
+    grid, guard = lab()
+    assert day_6.find_obsticle_pos(grid, guard, workers=2) == 6
+
+
+def test_detach_releases_shared_memory() -> None:
+    grid, guard = lab()
+    memory = day_6.share_table(day_6.JumpTable(grid))
+    try:
+        day_6.attach_table(memory.name, grid.rows, grid.cols)
+        assert day_6._shared is not None
+        attached = day_6._shared[0]
+        entries = day_6.first_entries(grid, guard)
+        assert day_6.count_shared_loops(entries) == 6
+        day_6.detach_table()
+        assert day_6._shared is None
+        assert attached.buf is None
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def random_lab(seed: int) -> PuzzleInput:
+    # Walls dense enough that some obstacles make loops and some labs already loop.
+    rng = random.Random(seed)
+    rows = [rng.choices(".#", weights=(8, 1), k=30) for _ in range(30)]
+    rows[15][15] = "^"
+    return make_puzzle("\n".join("".join(row) for row in rows))
+
+
+def test_queries_match_simulation() -> None:
+    labs = [load_puzzle("aoc_2024", 6, test=True)]
+    labs += [random_lab(seed) for seed in range(6)]
+    for puzzle in labs:
+        queries = day_6.ObstacleQueries.from_puzzle(puzzle)
+        grid, guard = queries.grid, queries.guard
+        cells = [cell for cell in range(len(grid)) if cell != guard[0]]
+        answers = queries.query_many(cells)
+        for cell in cells:
+            loops, _ = day_6.find_loop(grid.replace(cell, "#"), guard)
+            assert answers[cell] == loops, cell
+
+
+def test_query_off_map() -> None:
+    queries = day_6.ObstacleQueries.from_puzzle(load_puzzle("aoc_2024", 6, test=True))
+    with pytest.raises(ValueError):
+        queries.query(len(queries.grid))
+    with pytest.raises(ValueError):
+        queries.query(queries.guard[0])
@@ -0,0 +1,90 @@
+import itertools
+import random
+from collections.abc import Iterator, Sequence
+
+import pytest
+
+from aoc_2024 import day_7
+from aoc_2024.generators import generate
+from aoc_2024.runner import make_puzzle
+
+type Chunk = Sequence[tuple[int, Sequence[int]]]
+
+
+def equations(seed: int) -> list[tuple[int, Sequence[int]]]:
+    return list(day_7.parse_input(make_puzzle(generate(7, 300, seed))))
+
+
+def test_pool_matches_serial(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(day_7, "CHUNK_SIZE", 7)
+    found = equations(0)
+    for joins in (False, True):
+        serial = day_7.count_chunk(
+            found, day_7.make_solver(day_7.WITH_JOINS if joins else day_7.STANDARD)
+        )
+        assert day_7.count_possible(found, joins=joins, workers=2) == serial
+
+
+def test_pool_reads_ahead_boundedly() -> None:
+    found = equations(1)
+    read = 0
+
+    def chunks() -> Iterator[Chunk]:
+        nonlocal read
+        for i in range(0, len(found), 5):
+            read += 1
+            yield found[i : i + 5]
+
+    results = day_7.count_pooled(chunks(), day_7.solve, 2)
+    total = next(results)
+    assert read <= day_7.CHUNKS_IN_FLIGHT * 2 + 1
+    total += sum(results)
+    assert total == day_7.count_chunk(found, day_7.solve)
+
+
+def brute_force(
+    operators: Sequence[day_7.Operator], target: int, nums: Sequence[int]
+) -> bool:
+    """Try every combination of operators, evaluated left to right."""
+    for chosen in itertools.product(operators, repeat=len(nums) - 1):
+        value = nums[0]
+        for operator, num in zip(chosen, nums[1:]):
+            value = operator.apply(value, num)
+        if value == target:
+            return True
+    return False
+
+
+@pytest.mark.parametrize(
+    "operators",
+    [
+        day_7.STANDARD,
+        day_7.WITH_JOINS,
+        (day_7.Add(), day_7.Subtract()),
+        (day_7.Multiply(), day_7.Xor()),
+        (day_7.Add(), day_7.Multiply(), day_7.Concat(2)),
+        (day_7.Subtract(), day_7.Multiply(), day_7.Concat(3)),
+    ],
+)
+def test_solver_matches_brute_force(operators: Sequence[day_7.Operator]) -> None:
+    rng = random.Random(0)
+    solvers = [day_7.Solver(operators), day_7.make_solver(operators)]
+    for _ in range(300):
+        nums = [rng.randint(0, 12) for _ in range(rng.randint(1, 5))]
+        # Half the targets are reachable, the rest are usually not.
+        if rng.random() < 0.5:
+            chosen = rng.choices(operators, k=len(nums) - 1)
+            target = nums[0]
+            for operator, num in zip(chosen, nums[1:]):
+                target = operator.apply(target, num)
+        else:
+            target = rng.randint(-50, 500)
+        expected = brute_force(operators, target, nums)
+        for solver in solvers:
+            assert solver(target, nums) == expected, (target, nums)
+
+
+@pytest.mark.parametrize("base", [-1, 0, 1])
+def test_concat_needs_a_base(base: int) -> None:
+    with pytest.raises(ValueError):
+        day_7.Concat(base)
@@ -0,0 +1,11 @@
+from aoc_2024 import day_24
+from aoc_2024.generators import generate
+from aoc_2024.runner import make_puzzle
+
+
+def test_day_24_wide_adder() -> None:
+    raw = generate(24, 120, 1)
+    bits = dict(line.split(": ") for line in raw.split("\n\n")[0].splitlines())
+    x = sum(int(bits[f"x{i:03}"]) << i for i in range(120))
+    y = sum(int(bits[f"y{i:03}"]) << i for i in range(120))
+    assert day_24.part_1(make_puzzle(raw)) == x + y
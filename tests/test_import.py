@@ -0,0 +1,20 @@
+import subprocess
+import sys
+
+from aoc_2024.bench import DEFAULT_IMPORT_BUDGET_MS, import_time
+
+
+def test_import_time() -> None:
+    assert import_time("aoc_2024", 3) * 1000 < DEFAULT_IMPORT_BUDGET_MS
+
+
+def test_import_is_lazy() -> None:
+    code = (
+        "import sys, aoc_2024; "
+        "print(*[name for name in ('sympy', 'networkx', 'aoc_2024.day_21') "
+        "if name in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    assert result.stdout.split() == []
@@ -0,0 +1,44 @@
+from typing import Any, NamedTuple
+
+import pytest
+
+from aoc_2024 import parse_cache
+from aoc_2024.parse_cache import cached_parse, clear_cache, freeze
+from aoc_2024.runner import make_puzzle
+
+
+class Pair(NamedTuple):
+    left: Any
+    right: Any
+
+
+def test_freeze_namedtuple_fields() -> None:
+    frozen = freeze(Pair([1, 2], {3}))
+    assert frozen == Pair((1, 2), frozenset({3}))
+
+
+def test_freeze_copies_arrays() -> None:
+    np = pytest.importorskip("numpy")
+    numbers = np.arange(6)
+    frozen = freeze(numbers[0::2])
+    assert not frozen.flags.writeable
+    numbers[0] = 10
+    assert frozen.tolist() == [0, 2, 4]
+
+
+def test_cache_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(parse_cache, "CACHE_SIZE", 2)
+    monkeypatch.delenv(parse_cache.CACHE_DIR_ENV, raising=False)
+    clear_cache()
+    calls = []
+
+    @cached_parse
+    def parse(puzzle: Any) -> str:
+        calls.append(puzzle.raw)
+        return str(puzzle.raw)
+
+    for raw in ("a", "b", "a", "c", "a", "b"):
+        parse(make_puzzle(raw))
+    # "b" was the least recently used when "c" came in.
+    assert calls == ["a", "b", "c", "b"]
+    clear_cache()